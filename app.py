@@ -1,17 +1,22 @@
+import time
+APP_START = time.perf_counter()
+
 import streamlit as st
 import os
-import time
 import base64
 import cv2
 import shutil
 import json
-from src.rag_engine import RAGEngine
-from src.tts_generator import generate_audio
-from src.viseme_generator import VisemeGenerator
+import queue
+import threading
+from streamlit.runtime.scriptrunner import add_script_run_ctx
+from src.tts_generator import generate_audio, iter_sentence_audio
 from src.phoneme_engine import PhonemeEngine
-from src.vision_engine import VisionEngine
+from src.model_registry import ModelRegistry
 from src.config import DEFAULT_AVATAR_PATH
 
+IMPORT_SECONDS = time.perf_counter() - APP_START
+
 # --- Cleanup ---
 def cleanup_previous_session():
     if os.path.exists("outputs"):
@@ -31,14 +36,31 @@ def cleanup_previous_session():
                     print(f"Error removing {item_path}: {e}")
 
 # --- Loaders ---
-@st.cache_resource(show_spinner="Loading RAG Engine...")
-def load_rag_engine(): return RAGEngine()
+# Heavy engines (torch, transformers, langchain) are imported and built in background
+# threads at boot, so the UI renders immediately and each engine is waited on only when used.
+@st.cache_resource
+def load_registry():
+    registry = ModelRegistry()
+    registry.register("RAG Engine", "src.rag_engine", "RAGEngine")
+    registry.register("Vision Engine", "src.vision_engine", "VisionEngine")
+    registry.register("Animation Engine", "src.viseme_generator", "VisemeGenerator")
+    registry.start()
+    return registry
+
+def load_engine(name):
+    registry = load_registry()
+    if registry.is_ready(name):
+        return registry.get(name)
+    with st.spinner(f"Loading {name}..."):
+        return registry.get(name)
+
+def load_rag_engine(): return load_engine("RAG Engine")
 
-@st.cache_resource(show_spinner="Loading Vision Engine...")
-def load_vision_engine(): return VisionEngine()
+def load_vision_engine(): return load_engine("Vision Engine")
 
-@st.cache_resource(show_spinner="Loading Animation Engine...")
-def load_animation_engines(): return VisemeGenerator(), PhonemeEngine()
+def load_animation_engine(): return load_engine("Animation Engine")
+
+phoneme_engine = PhonemeEngine()
 
 st.set_page_config(page_title="Knowledge To Life", layout="wide")
 
@@ -102,8 +124,7 @@ def play_viseme_animation(text, audio_path, container, viseme_imgs, static_b64,
             
             if char_idx < len(text):
                 char = text[char_idx]
-                phoneme_eng = load_animation_engines()[1]
-                viseme_name = phoneme_eng.get_viseme_for_char(char)
+                viseme_name = phoneme_engine.get_viseme_for_char(char)
                 if viseme_name in viseme_imgs:
                     b64_frame = img_to_b64(viseme_imgs[viseme_name])
                     container.markdown(render_avatar_html(b64_frame), unsafe_allow_html=True)
@@ -121,10 +142,13 @@ def play_viseme_animation(text, audio_path, container, viseme_imgs, static_b64,
 # --- Init Avatar ---
 if "avatar_path" not in st.session_state:
     st.session_state.avatar_path = DEFAULT_AVATAR_PATH
-    if not os.path.exists("temp/visemes"):
-        viseme_gen, _ = load_animation_engines()
-        with st.spinner("Creating Avatar Voice Model..."):
-            st.session_state.viseme_dir = viseme_gen.generate_visemes(DEFAULT_AVATAR_PATH)
+
+# Visemes are built once the animation engine has finished loading; until then the static avatar is shown
+if ("viseme_dir" not in st.session_state and not os.path.exists("temp/visemes")
+        and load_registry().is_ready("Animation Engine")):
+    viseme_gen = load_animation_engine()
+    with st.spinner("Creating Avatar Voice Model..."):
+        st.session_state.viseme_dir = viseme_gen.generate_visemes(st.session_state.avatar_path)
 
 # --- Sidebar ---
 with st.sidebar:
@@ -134,20 +158,29 @@ with st.sidebar:
         with open("assets/custom.jpg", "wb") as f:
             f.write(uploaded_avatar.getbuffer())
         st.session_state.avatar_path = "assets/custom.jpg"
-        viseme_gen, _ = load_animation_engines()
+        viseme_gen = load_animation_engine()
         with st.spinner("Updating Avatar Voice Model..."):
             st.session_state.viseme_dir = viseme_gen.generate_visemes("assets/custom.jpg")
         st.success("Avatar Updated!")
 
+    st.subheader("Engines")
+    for name, info in load_registry().status().items():
+        if info["state"] == "ready":
+            st.caption(f"✅ {name}: ready (import {info['import_s']:.1f}s, init {info['init_s']:.1f}s)")
+        elif info["state"] == "failed":
+            st.caption(f"❌ {name}: failed to load")
+        else:
+            st.caption(f"⏳ {name}: loading...")
+    if "startup_seconds" in st.session_state:
+        st.caption(f"App imports {IMPORT_SECONDS:.2f}s, first render {st.session_state.startup_seconds:.2f}s")
+    st.button("Refresh Status")
+
 # --- UI ---
 st.markdown("<h1 style='text-align: center;'>Knowledge To Life</h1>", unsafe_allow_html=True)
 col_vid, col_chat = st.columns([1, 2])
 
 # Load Base Images
-if "viseme_dir" not in st.session_state:
-    st.session_state.viseme_dir = "temp/visemes"
-    
-v_dir = st.session_state.viseme_dir
+v_dir = st.session_state.get("viseme_dir", "temp/visemes")
 viseme_imgs = {}
 if v_dir:
     for name in ['idle', 'a', 'e', 'o', 'm']:
@@ -172,30 +205,51 @@ with col_chat:
     
     # --- CHAT ---
     with tab1:
-        rag_engine = load_rag_engine()
-        uploaded_pdf = st.file_uploader("Upload Knowledge (PDF)", type="pdf", key="pdf_up")
-        if uploaded_pdf:
-            if "last_file" not in st.session_state or st.session_state.last_file != uploaded_pdf.name:
-                with st.spinner("Reading Document..."):
-                    with open("temp/doc.pdf", "wb") as f:
-                        f.write(uploaded_pdf.getbuffer())
-                    rag_engine.ingest_pdf("temp/doc.pdf")
-                    st.session_state.last_file = uploaded_pdf.name
-                st.success("Knowledge Base Ready!")
+        uploaded_pdfs = st.file_uploader("Upload Knowledge (PDF)", type="pdf", key="pdf_up", accept_multiple_files=True)
+        if "documents" not in st.session_state:
+            st.session_state.documents = {}
+
+        # Drop documents the user removed from the uploader
+        uploaded_names = {pdf.name for pdf in uploaded_pdfs}
+        for name in list(st.session_state.documents):
+            if name not in uploaded_names:
+                # Each upload holds the shared shard; it is dropped once no session holds it
+                load_rag_engine().remove_document(st.session_state.documents.pop(name))
+
+        new_pdfs = [pdf for pdf in uploaded_pdfs if pdf.name not in st.session_state.documents]
+        for uploaded_pdf in new_pdfs:
+            rag_engine = load_rag_engine()
+            with st.spinner(f"Reading {uploaded_pdf.name}..."):
+                pdf_path = os.path.join("temp", os.path.basename(uploaded_pdf.name))
+                with open(pdf_path, "wb") as f:
+                    f.write(uploaded_pdf.getbuffer())
+                ingest_bar = st.progress(0.0, text="Reading pages...")
+                def report_ingest(pages_done, total_pages, chunks_done):
+                    ingest_bar.progress(pages_done / max(total_pages, 1),
+                                        text=f"Read {pages_done}/{total_pages} pages, indexed {chunks_done} chunks")
+                doc_id = rag_engine.ingest_pdf(pdf_path, progress_callback=report_ingest)
+                ingest_bar.empty()
+                st.session_state.documents[uploaded_pdf.name] = doc_id
+        if new_pdfs:
+            st.success(f"Knowledge Base Ready! ({len(st.session_state.documents)} documents)")
 
         chat_container = st.container()
         with chat_container:
             for idx, msg in enumerate(st.session_state.messages):
                 with st.chat_message(msg["role"]):
                     st.markdown(msg["content"])
-                    if msg["role"] == "assistant" and msg.get("audio_path"):
+                    if msg["role"] == "assistant" and msg.get("clips"):
                         meta_c1, meta_c2 = st.columns([1, 5])
                         with meta_c1:
                             if msg.get("latency"):
                                 st.caption(f"⏱️ {msg['latency']:.2f}s")
                         with meta_c2:
                             if st.button("🔄 Replay", key=f"replay_{idx}"):
-                                play_viseme_animation(msg["content"], msg["audio_path"], avatar_container, viseme_imgs, b64_static, audio_player_container)
+                                for sentence, clip_path in msg["clips"]:
+                                    # Old sentence files are evicted; re-create them (a clip cache hit)
+                                    if not os.path.exists(clip_path) and not generate_audio(sentence, output_file=clip_path):
+                                        continue
+                                    play_viseme_animation(sentence, clip_path, avatar_container, viseme_imgs, b64_static, audio_player_container)
 
         if prompt := st.chat_input("Ask a question..."):
             start_ts = time.time()
@@ -204,26 +258,61 @@ with col_chat:
                 with st.chat_message("user"):
                     st.markdown(prompt)
 
-            with st.spinner("Thinking..."):
-                answer = rag_engine.answer_question(prompt)
-            
-            audio_path = generate_audio(answer)
-            latency = time.time() - start_ts
-            
-            st.session_state.messages.append({"role": "assistant", "content": answer, "latency": latency, "audio_path": audio_path})
-            
+            rag_engine = load_rag_engine()
+
+            # Stream tokens into the chat bubble and speak each sentence as soon as it closes
+            answer_parts = []
+            clips = []
+            first_audio_latency = None
             with chat_container:
                 with st.chat_message("assistant"):
-                    st.markdown(answer)
-                    st.caption(f"⏱️ {latency:.2f}s")
+                    answer_placeholder = st.empty()
+                    token_queue = queue.Queue()
+                    answer_errors = []
+
+                    # Generation runs on its own thread carrying this script's context, so the
+                    # bubble keeps filling in while a clip plays and Streamlit accepts the updates
+                    def pump_answer():
+                        try:
+                            for piece in rag_engine.answer_question_stream(prompt):
+                                answer_parts.append(piece)
+                                answer_placeholder.markdown("".join(answer_parts))
+                                token_queue.put(piece)
+                        except Exception as e:
+                            answer_errors.append(e)
+                        finally:
+                            token_queue.put(None)
+
+                    pump = threading.Thread(target=pump_answer, daemon=True)
+                    add_script_run_ctx(pump)
+                    pump.start()
 
-            if audio_path:
-                play_viseme_animation(answer, audio_path, avatar_container, viseme_imgs, b64_static, audio_player_container)
+                    def answer_tokens():
+                        # Only hands text on; the TTS producer thread has no script context
+                        yield from iter(token_queue.get, None)
+                        if answer_errors:
+                            raise answer_errors[0]
+
+                    for sentence, clip_path in iter_sentence_audio(answer_tokens()):
+                        if not clip_path:
+                            continue
+                        if first_audio_latency is None:
+                            first_audio_latency = time.time() - start_ts
+                        clips.append((sentence, clip_path))
+                        play_viseme_animation(sentence, clip_path, avatar_container, viseme_imgs, b64_static, audio_player_container)
+
+                    answer = "".join(answer_parts).strip()
+                    answer_placeholder.markdown(answer)
+                    latency = time.time() - start_ts
+                    if first_audio_latency is not None:
+                        st.caption(f"⏱️ {latency:.2f}s (first audio {first_audio_latency:.2f}s)")
+                    else:
+                        st.caption(f"⏱️ {latency:.2f}s")
+
+            st.session_state.messages.append({"role": "assistant", "content": answer, "latency": latency, "clips": clips})
 
     # --- SNAP ---
     with tab2:
-        vision_engine = load_vision_engine()
-        
         if 'camera_active' not in st.session_state: st.session_state.camera_active = False
         if 'snap_image' not in st.session_state: st.session_state.snap_image = None
 
@@ -243,6 +332,7 @@ with col_chat:
             st.image(st.session_state.snap_image)
             
             if 'analysis_done' not in st.session_state:
+                vision_engine = load_vision_engine()
                 with st.spinner("Analyzing..."):
                     desc = vision_engine.analyze_image(st.session_state.snap_image)
                     res = f"I see {desc}"
@@ -261,3 +351,7 @@ with col_chat:
                     del st.session_state.analysis_done
                 st.session_state.camera_active = True
                 st.rerun()
+
+if "startup_seconds" not in st.session_state:
+    st.session_state.startup_seconds = time.perf_counter() - APP_START
+    print(f"App imports took {IMPORT_SECONDS:.2f}s, first render {st.session_state.startup_seconds:.2f}s")
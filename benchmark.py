@@ -0,0 +1,504 @@
+import gc
+import os
+import sys
+import time
+import argparse
+import difflib
+from src.utils import setup_logger
+from src.config import LLM_MODEL_ID
+
+logger = setup_logger("Benchmark")
+
+SAMPLE_CONTEXT = (
+    "Sanjaya said: O King, after looking over the army arranged in military formation by the sons of Pandu, "
+    "King Duryodhana went to his teacher and spoke the following words. O my teacher, behold the great army "
+    "of the sons of Pandu, so expertly arranged by your intelligent disciple the son of Drupada. "
+    "The Blessed Lord said: While speaking learned words, you are mourning for what is not worthy of grief. "
+    "Those who are wise lament neither for the living nor for the dead. Never was there a time when I did not "
+    "exist, nor you, nor all these kings; nor in the future shall any of us cease to be."
+)
+
+SAMPLE_QUESTIONS = [
+    "Who did Duryodhana speak to?",
+    "Who arranged the army of the sons of Pandu?",
+    "What do the wise not lament for?",
+    "What did the Blessed Lord say about the past and the future?",
+    "Why is mourning described as unworthy?",
+]
+
+
+def bench_llm_precision(args):
+    """Compares latency, resident memory and answer agreement of LLM precisions against fp32."""
+    import torch
+    from src.rag_engine import load_llm, GENERATION_KWARGS
+
+    prompts = [f"Context:\n{SAMPLE_CONTEXT}\n\nQuestion: {q}\n\nAnswer:" for q in SAMPLE_QUESTIONS]
+    results = {}
+    for precision in ["fp32"] + [p for p in args.precisions if p != "fp32"]:
+        rss_before = _rss_bytes()
+        start = time.perf_counter()
+        tokenizer, model = load_llm(args.model, precision)
+        load_time = time.perf_counter() - start
+        rss_mb = (_rss_bytes() - rss_before) / 1024 ** 2
+
+        answers, latencies, new_tokens = [], [], 0
+        with torch.no_grad():
+            for prompt in prompts:
+                inputs = tokenizer(prompt, return_tensors="pt")
+                start = time.perf_counter()
+                output = model.generate(**inputs, **GENERATION_KWARGS)
+                latencies.append(time.perf_counter() - start)
+                new_tokens += output.shape[-1]
+                answers.append(tokenizer.decode(output[0], skip_special_tokens=True).strip())
+
+        results[precision] = {
+            "load_s": load_time,
+            "rss_mb": rss_mb,
+            "latency_s": sum(latencies) / len(latencies),
+            "tokens_per_s": new_tokens / sum(latencies),
+            "answers": answers,
+        }
+        del model
+        gc.collect()
+
+    reference = results["fp32"]["answers"]
+    print(f"\n{'precision':<10}{'load s':>8}{'RSS MB':>10}{'latency s':>11}{'tok/s':>8}{'exact':>8}{'similar':>9}")
+    for precision, r in results.items():
+        exact = sum(a == b for a, b in zip(r["answers"], reference)) / len(reference)
+        similar = sum(
+            difflib.SequenceMatcher(None, a.split(), b.split()).ratio() for a, b in zip(r["answers"], reference)
+        ) / len(reference)
+        print(f"{precision:<10}{r['load_s']:>8.1f}{r['rss_mb']:>10.0f}{r['latency_s']:>11.2f}"
+              f"{r['tokens_per_s']:>8.1f}{exact:>8.0%}{similar:>9.0%}")
+
+
+def _rss_bytes():
+    """Current resident set size; falls back to the peak (ru_maxrss) where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def bench_qa_batch(args):
+    """Measures answer_questions throughput as the batch size grows."""
+    from src.rag_engine import RAGEngine
+
+    engine = RAGEngine()
+    engine.ingest_pdf(args.pdf)
+    queries = (SAMPLE_QUESTIONS * args.repeat)[:args.num_queries]
+
+    print(f"\n{'batch':>6}{'total s':>10}{'q/s':>8}{'speedup':>9}")
+    baseline = None
+    for batch_size in args.batch_sizes:
+        # Bypass the answer cache so every size does the full work
+        engine.answer_cache.entries.clear()
+        start = time.perf_counter()
+        engine.answer_questions(queries, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{batch_size:>6}{elapsed:>10.2f}{len(queries) / elapsed:>8.2f}{baseline / elapsed:>8.2f}x")
+
+
+def bench_retrieval(args):
+    """Compares vector-only and hybrid BM25 + vector retrieval latency."""
+    import random
+    from src.rag_engine import RAGEngine
+
+    engine = RAGEngine()
+    engine.ingest_pdf(args.pdf)
+    kb = engine.knowledge_base
+
+    # Exact-phrase lookups drawn from the document, plus natural-language questions
+    rng = random.Random(0)
+    store = next(iter(kb.shards.values()))
+    chunks = [store.docstore.search(store.index_to_docstore_id[i]).page_content for i in range(store.index.ntotal)]
+    queries = list(SAMPLE_QUESTIONS)
+    for chunk in rng.sample(chunks, min(args.num_queries, len(chunks))):
+        words = chunk.split()
+        start = rng.randrange(max(1, len(words) - 4))
+        queries.append(" ".join(words[start:start + 4]))
+
+    start = time.perf_counter()
+    for query in queries:
+        kb.search_by_vector(engine.embeddings.embed_query(query), k=5)
+    vector_time = (time.perf_counter() - start) / len(queries)
+
+    lexical_only = 0
+    start = time.perf_counter()
+    for query in queries:
+        kb.hybrid_search(query, k=5)
+        lexical_only += kb.last_search_mode == "lexical"
+    hybrid_time = (time.perf_counter() - start) / len(queries)
+
+    print(f"\n{len(queries)} queries")
+    print(f"vector-only: {vector_time * 1000:.2f} ms/query")
+    print(f"hybrid:      {hybrid_time * 1000:.2f} ms/query ({lexical_only / len(queries):.0%} on the lexical fast path)")
+
+
+def bench_embeddings(args):
+    """Checks ONNX embedding parity against PyTorch and compares throughput."""
+    import numpy as np
+    from langchain_huggingface import HuggingFaceEmbeddings
+    from src.onnx_embeddings import OnnxEmbeddings
+    from src.config import EMBEDDING_MODEL_ID
+
+    sentences = SAMPLE_CONTEXT.split(". ")
+    texts = [" ".join(sentences[i % len(sentences):] + sentences[:i % len(sentences)])[: 50 + (i * 37) % 900]
+             for i in range(args.num_texts)]
+
+    backends = {
+        "torch": HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_ID),
+        "onnx-fp32": OnnxEmbeddings(EMBEDDING_MODEL_ID, quantize=False),
+        "onnx-int8": OnnxEmbeddings(EMBEDDING_MODEL_ID, quantize=True),
+    }
+    vectors = {}
+    failed = []
+    print(f"\n{'backend':<11}{'texts/s':>9}{'min cos':>9}{'mean cos':>10}  parity")
+    for name, embeddings in backends.items():
+        embeddings.embed_documents(texts[:8])  # Warm-up
+        start = time.perf_counter()
+        vectors[name] = np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
+        throughput = len(texts) / (time.perf_counter() - start)
+
+        reference = vectors["torch"]
+        cosine = (vectors[name] * reference).sum(axis=1) / (
+            np.linalg.norm(vectors[name], axis=1) * np.linalg.norm(reference, axis=1))
+        tolerance = 0.99 if name.endswith("int8") else 0.9999
+        parity = "OK" if cosine.min() >= tolerance else "FAIL"
+        if parity == "FAIL":
+            failed.append(name)
+        print(f"{name:<11}{throughput:>9.1f}{cosine.min():>9.5f}{cosine.mean():>10.5f}  {parity} (>= {tolerance})")
+    if failed:
+        print(f"Parity check failed for: {', '.join(failed)}")
+    return not failed
+
+
+def bench_assisted(args):
+    """
+    Checks that assisted decoding reproduces greedy output and measures its speedup.
+    With --tiny, randomly initialised T5 target and draft models are used so the
+    parity check runs offline in seconds.
+    """
+    from src.rag_engine import load_llm, generate_with_stats
+
+    if args.tiny:
+        model, draft_model, prompts = _tiny_t5_pair()
+    else:
+        tokenizer, model = load_llm(args.target, "fp32")
+        _, draft_model = load_llm(args.draft, "fp32")
+        prompts = [(question, tokenizer(f"Context:\n{SAMPLE_CONTEXT}\n\nQuestion: {question}\n\nAnswer:",
+                                        return_tensors="pt"))
+                   for question in SAMPLE_QUESTIONS]
+
+    print(f"\n{'question':<45}{'match':>6}{'accept':>8}{'est':>7}{'actual':>8}")
+    matches = 0
+    for question, inputs in prompts:
+        start = time.perf_counter()
+        plain, _ = generate_with_stats(model, inputs)
+        plain_time = time.perf_counter() - start
+        start = time.perf_counter()
+        assisted, stats = generate_with_stats(model, inputs, draft_model)
+        assisted_time = time.perf_counter() - start
+
+        match = plain.tolist() == assisted.tolist()
+        matches += match
+        print(f"{question[:44]:<45}{'yes' if match else 'NO':>6}{stats['acceptance_rate']:>8.0%}"
+              f"{stats['speedup_est']:>6.2f}x{plain_time / assisted_time:>7.2f}x")
+    print(f"{matches}/{len(prompts)} outputs identical to plain greedy decoding")
+    return matches == len(prompts)
+
+
+def _tiny_t5_pair(vocab_size=128, prompt_length=48):
+    """Randomly initialised T5 target and draft sharing a vocabulary, with random prompts."""
+    import torch
+    from transformers import T5Config, T5ForConditionalGeneration
+
+    torch.manual_seed(0)
+
+    def tiny(num_layers, d_model):
+        config = T5Config(vocab_size=vocab_size, d_model=d_model, d_kv=8, d_ff=2 * d_model,
+                          num_layers=num_layers, num_heads=4, decoder_start_token_id=0,
+                          pad_token_id=0, eos_token_id=1)
+        return T5ForConditionalGeneration(config).eval()
+
+    model, draft_model = tiny(4, 64), tiny(1, 32)
+    prompts = []
+    for i in range(len(SAMPLE_QUESTIONS)):
+        input_ids = torch.randint(2, vocab_size, (1, prompt_length))
+        prompts.append((f"random prompt {i + 1}", {"input_ids": input_ids,
+                                                   "attention_mask": torch.ones_like(input_ids)}))
+    return model, draft_model, prompts
+
+
+def bench_pdf_pages(args):
+    """Measures page extraction wall time as the worker count grows, bypassing the page cache."""
+    import os
+    from src.pdf_extractor import iter_page_texts
+
+    cpu_count = os.cpu_count() or 1
+    worker_counts = args.workers or sorted({1, 2, 4, 8, cpu_count} & set(range(1, cpu_count + 1)))
+    print(f"\n{'workers':>8}{'pages':>7}{'seconds':>9}{'pages/s':>9}{'speedup':>9}")
+    baseline = None
+    for workers in worker_counts:
+        start = time.perf_counter()
+        pages = sum(1 for _ in iter_page_texts(args.pdf, workers, use_cache=False))
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{workers:>8}{pages:>7}{elapsed:>9.2f}{pages / elapsed:>9.1f}{baseline / elapsed:>8.2f}x")
+
+
+def bench_mel(args):
+    """
+    Checks the vectorised mel front-end against Wav2Lip's librosa path and times both.
+    Window placement is checked first against Wav2Lip's loop, which needs no librosa.
+    """
+    import sys
+    import numpy as np
+    from src.config import WAV2LIP_DIR
+    from src.audio_clip import AudioClip
+    from src.mel_frontend import melspectrogram, mel_windows, window_starts
+
+    def reference_starts(num_frames, fps, step):
+        starts, i = [], 0
+        while int(i * 80. / fps) + step <= num_frames:
+            starts.append(int(i * 80. / fps))
+            i += 1
+        return starts
+
+    mismatches = [(frames, fps, step) for fps in (24, 25, 29.97, 30, 60) for step in (1, 16)
+                  for frames in range(0, 400)
+                  if window_starts(frames, fps, step).tolist() != reference_starts(frames, fps, step)]
+    print(f"window_starts: {'OK' if not mismatches else f'{len(mismatches)} mismatches, e.g. {mismatches[0]}'}")
+    if mismatches:
+        return False
+
+    sys.path.append(WAV2LIP_DIR)
+    import Wav2Lip.audio as audio
+
+    if args.audio:
+        wav = AudioClip.from_file(args.audio).samples
+    else:
+        rng = np.random.default_rng(0)
+        t = np.arange(int(args.seconds * 16000)) / 16000
+        wav = (0.3 * np.sin(2 * np.pi * 220 * t) * (1 + np.sin(2 * np.pi * 3 * t)) +
+               0.02 * rng.standard_normal(len(t))).astype(np.float32)
+
+    def reference_windows(mel, fps=25, step=16):
+        chunks, i = [], 0
+        while True:
+            start_idx = int(i * 80. / fps)
+            if start_idx + step > len(mel[0]):
+                break
+            m = mel[:, start_idx:start_idx + step]
+            chunks.append(np.transpose(np.reshape(m, [1, m.shape[0], m.shape[1], 1]), (0, 3, 1, 2)))
+            i += 1
+        return np.concatenate(chunks, axis=0)
+
+    def timed(fn):
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            result = fn()
+        return result, (time.perf_counter() - start) / args.repeat * 1000
+
+    reference, ref_ms = timed(lambda: reference_windows(audio.melspectrogram(wav)))
+    print(f"\n{'path':>10}{'ms':>9}{'speedup':>9}{'max |diff|':>12}{'within tol':>12}")
+    print(f"{'librosa':>10}{ref_ms:>9.2f}{1:>8.2f}x{0:>12.2e}{'-':>12}")
+    passed = True
+    for backend in args.backends:
+        windows, ms = timed(lambda: mel_windows(melspectrogram(wav, backend)))
+        diff = float(np.abs(windows - reference).max()) if windows.shape == reference.shape else float("inf")
+        passed = passed and diff <= args.tolerance
+        print(f"{backend:>10}{ms:>9.2f}{ref_ms / ms:>8.2f}x{diff:>12.2e}{str(diff <= args.tolerance):>12}")
+    return passed
+
+
+def bench_tts_stream(args):
+    """
+    Checks that streamed narration speaks the first sentence as soon as it is synthesised,
+    without waiting for the next sentence to close. Uses a fixed-delay offline TTS backend.
+    """
+    import asyncio
+    import shutil
+    import tempfile
+    import src.tts_generator as tts_generator
+
+    async def fixed_delay_tts(text, voice, output_file):
+        await asyncio.sleep(args.synth_delay)
+        with open(output_file, "wb") as f:
+            f.write(text.encode("utf-8"))
+
+    tts_generator.TTS_BACKENDS["fixed-delay"] = fixed_delay_tts
+    sentences = [question.replace("?", ".") for question in SAMPLE_QUESTIONS]
+
+    def llm_stream():
+        # Each sentence closes `sentence_gap` seconds after the previous one, word by word
+        for sentence in sentences:
+            words = sentence.split()
+            for word in words:
+                time.sleep(args.sentence_gap / len(words))
+                yield word + " "
+
+    workspace = tempfile.mkdtemp(prefix="bench_tts_stream_")
+    original_output_dir, tts_generator.OUTPUT_DIR = tts_generator.OUTPUT_DIR, workspace
+    try:
+        start = time.perf_counter()
+        arrivals = [time.perf_counter() - start for _ in tts_generator.iter_audio_segments(
+            llm_stream(), backend="fixed-delay", use_cache=False)]
+    finally:
+        tts_generator.OUTPUT_DIR = original_output_dir
+        shutil.rmtree(workspace, ignore_errors=True)
+
+    expected = args.sentence_gap + args.synth_delay
+    passed = len(arrivals) == len(sentences) and arrivals[0] <= expected + args.slack
+    print(f"\n{len(arrivals)} segments; first audio at {arrivals[0]:.2f} s "
+          f"(first sentence closes at {args.sentence_gap:.2f} s, expected <= {expected + args.slack:.2f} s)")
+    print(f"time to first audio: {'OK' if passed else 'FAIL'}")
+    return passed
+
+
+def bench_encode(args):
+    """
+    Compares the mp4v write + ffmpeg remux path with the single-pass pipe encoder per phrase,
+    and measures the per-phrase cost of starting an encoder process (a one-frame encode).
+    """
+    import os
+    import shutil
+    import tempfile
+    import subprocess
+    import cv2
+    import numpy as np
+    from src.audio_clip import AudioClip
+    from src.video_encoder import PipeVideoEncoder
+
+    fps = 25
+    rng = np.random.default_rng(0)
+    background = rng.integers(0, 255, (args.size, args.size, 3), dtype=np.uint8)
+    frames = []
+    for i in range(int(args.seconds * fps)):
+        frame = background.copy()
+        frame[args.size // 2:, args.size // 4:3 * args.size // 4] = (i * 7) % 255  # Moving "mouth"
+        frames.append(frame)
+    t = np.arange(int(args.seconds * 16000)) / 16000
+    clip = AudioClip(0.3 * np.sin(2 * np.pi * 220 * t))
+
+    workspace = tempfile.mkdtemp(prefix="bench_encode_")
+
+    def disk_bytes():
+        return sum(os.path.getsize(os.path.join(workspace, f)) for f in os.listdir(workspace))
+
+    def legacy():
+        audio_path = clip.save_wav(os.path.join(workspace, "phrase.wav"))
+        silent = os.path.join(workspace, "phrase.mp4")
+        out = cv2.VideoWriter(silent, cv2.VideoWriter_fourcc(*"mp4v"), fps, (args.size, args.size))
+        for frame in frames:
+            out.write(frame)
+        out.release()
+        subprocess.run(["ffmpeg", "-y", "-i", silent, "-i", audio_path, "-c:v", "copy", "-c:a", "aac",
+                        "-shortest", silent.replace(".mp4", "_audio.mp4")],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def pipe(output_path, frames=frames, audio=clip):
+        with PipeVideoEncoder(args.size, args.size, fps, audio=audio, output_path=output_path) as encoder:
+            for frame in frames:
+                encoder.write(frame)
+            return encoder.close()
+
+    paths = [
+        ("mp4v+mux", legacy),
+        ("pipe-file", lambda: pipe(os.path.join(workspace, "phrase_pipe.mp4"))),
+        ("pipe-memory", lambda: pipe(None)),
+        # Start-up, one frame and teardown: the overhead a per-session encoder would save per phrase
+        ("spawn", lambda: pipe(None, frames[:1], AudioClip(clip.samples[:16000 // fps]))),
+    ]
+    timings = {}
+    print(f"\n{'path':>12}{'seconds':>9}{'disk MB':>9}{'output MB':>11}")
+    try:
+        for name, run in paths:
+            elapsed, written, output_size = 0.0, 0, 0
+            for _ in range(args.repeat):
+                for f in os.listdir(workspace):
+                    os.remove(os.path.join(workspace, f))
+                start = time.perf_counter()
+                result = run()
+                elapsed += time.perf_counter() - start
+                written += disk_bytes()
+                output_size = len(result) if isinstance(result, bytes) else max(
+                    (os.path.getsize(os.path.join(workspace, f)) for f in os.listdir(workspace) if f.endswith(".mp4")),
+                    default=0)
+            timings[name] = elapsed / args.repeat
+            print(f"{name:>12}{elapsed / args.repeat:>9.2f}{written / args.repeat / 1024 ** 2:>9.2f}"
+                  f"{output_size / 1024 ** 2:>11.2f}")
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+    print(f"Encoder start-up is {timings['spawn'] / timings['pipe-memory']:.0%} of a {args.seconds:g} s phrase's encode")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Knowledge To Life performance benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    llm_parser = subparsers.add_parser("llm-precision", help="LLM latency, size and agreement per precision")
+    llm_parser.add_argument("--model", type=str, default=LLM_MODEL_ID, help="Seq2seq model id")
+    llm_parser.add_argument("--precisions", nargs="+", default=["fp32", "int8", "bf16"], help="Precisions to compare")
+    llm_parser.set_defaults(func=bench_llm_precision)
+
+    qa_parser = subparsers.add_parser("qa-batch", help="Batched question answering throughput")
+    qa_parser.add_argument("--pdf", type=str, required=True, help="PDF to ingest")
+    qa_parser.add_argument("--num_queries", type=int, default=16, help="Questions per run")
+    qa_parser.add_argument("--repeat", type=int, default=4, help="Times the sample questions are repeated")
+    qa_parser.add_argument("--batch_sizes", type=int, nargs="+", default=[1, 2, 4, 8], help="Batch sizes to compare")
+    qa_parser.set_defaults(func=bench_qa_batch)
+
+    retrieval_parser = subparsers.add_parser("retrieval", help="Vector-only vs hybrid retrieval latency")
+    retrieval_parser.add_argument("--pdf", type=str, required=True, help="PDF to ingest")
+    retrieval_parser.add_argument("--num_queries", type=int, default=50, help="Exact-phrase queries sampled from the PDF")
+    retrieval_parser.set_defaults(func=bench_retrieval)
+
+    embed_parser = subparsers.add_parser("embeddings", help="ONNX vs PyTorch embedding parity and throughput")
+    embed_parser.add_argument("--num_texts", type=int, default=512, help="Texts embedded per backend")
+    embed_parser.set_defaults(func=bench_embeddings)
+
+    assisted_parser = subparsers.add_parser("assisted", help="Assisted decoding parity, acceptance and speedup")
+    assisted_parser.add_argument("--target", type=str, default=LLM_MODEL_ID, help="Model whose output is kept")
+    assisted_parser.add_argument("--draft", type=str, default="MBZUAI/LaMini-T5-61M", help="Draft model sharing the tokenizer")
+    assisted_parser.add_argument("--tiny", action="store_true",
+                                 help="Use randomly initialised tiny T5 models (offline parity check)")
+    assisted_parser.set_defaults(func=bench_assisted)
+
+    pages_parser = subparsers.add_parser("pdf-pages", help="Parallel PDF page extraction scaling")
+    pages_parser.add_argument("--pdf", type=str, required=True, help="PDF to extract")
+    pages_parser.add_argument("--workers", type=int, nargs="+", help="Worker counts to compare (default: 1, 2, 4, 8, all)")
+    pages_parser.set_defaults(func=bench_pdf_pages)
+
+    mel_parser = subparsers.add_parser("mel", help="Vectorised mel front-end parity and speed vs Wav2Lip")
+    mel_parser.add_argument("--audio", type=str, help="Audio file to analyse (default: synthetic speech-like tone)")
+    mel_parser.add_argument("--seconds", type=float, default=5.0, help="Length of the synthetic clip")
+    mel_parser.add_argument("--backends", nargs="+", default=["numpy", "torch"], help="STFT backends to compare")
+    mel_parser.add_argument("--repeat", type=int, default=10, help="Timed runs per path")
+    mel_parser.add_argument("--tolerance", type=float, default=1e-3, help="Largest accepted difference (normalised mel units)")
+    mel_parser.set_defaults(func=bench_mel)
+
+    tts_parser = subparsers.add_parser("tts-stream", help="Time to first audio for streamed narration")
+    tts_parser.add_argument("--sentence_gap", type=float, default=0.6, help="Seconds for each sentence to close")
+    tts_parser.add_argument("--synth_delay", type=float, default=0.3, help="Seconds to synthesise one segment")
+    tts_parser.add_argument("--slack", type=float, default=0.25, help="Allowed scheduling overhead in seconds")
+    tts_parser.set_defaults(func=bench_tts_stream)
+
+    encode_parser = subparsers.add_parser("encode", help="mp4v + remux vs single-pass ffmpeg pipe encoding")
+    encode_parser.add_argument("--seconds", type=float, default=3.0, help="Phrase length")
+    encode_parser.add_argument("--size", type=int, default=512, help="Frame width and height")
+    encode_parser.add_argument("--repeat", type=int, default=3, help="Timed runs per path")
+    encode_parser.set_defaults(func=bench_encode)
+
+    args = parser.parse_args()
+    # Benchmarks with a correctness check return False when it fails
+    if args.func(args) is False:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 import os
 import argparse
-from src.pdf_extractor import extract_text_from_pdf
-from src.tts_generator import generate_audio
+from src.pdf_extractor import extract_text_from_pdf, iter_paragraphs
+from src.tts_generator import generate_audio, generate_audio_from_paragraphs
 from src.video_generator import generate_avatar_video
 from src.utils import setup_logger
 from src.config import DEFAULT_AVATAR_PATH
@@ -15,6 +15,7 @@ def main():
     parser.add_argument("--chapter", type=int, help="Specific chapter to process (optional)")
     parser.add_argument("--avatar_image", type=str, default=DEFAULT_AVATAR_PATH, help="Path to Krishna avatar image")
     parser.add_argument("--output", type=str, default="output_video.mp4", help="Output video filename")
+    parser.add_argument("--workers", type=int, default=None, help="PDF page extraction processes (default: all cores)")
     
     args = parser.parse_args()
 
@@ -22,19 +23,24 @@ def main():
         logger.error(f"PDF file not found: {args.pdf_path}")
         return
 
-    # 1. Extract Text
-    logger.info(f"Extracting text from {args.pdf_path}...")
-    text_data = extract_text_from_pdf(args.pdf_path, args.chapter)
-    
-    if not text_data:
-        logger.error("No text found or failed to extract text.")
-        return
+    if args.chapter is None:
+        # 1+2. Stream paragraphs straight into TTS while later pages are still being read
+        logger.info(f"Streaming text from {args.pdf_path} into audio in {args.lang}...")
+        audio_path = generate_audio_from_paragraphs(iter_paragraphs(args.pdf_path, args.workers), args.lang)
+    else:
+        # 1. Extract Text
+        logger.info(f"Extracting text from {args.pdf_path}...")
+        text_data = extract_text_from_pdf(args.pdf_path, args.chapter, args.workers)
         
-    logger.info(f"Extracted {len(text_data)} characters.")
+        if not text_data:
+            logger.error("No text found or failed to extract text.")
+            return
+            
+        logger.info(f"Extracted {len(text_data)} characters.")
 
-    # 2. Generate Audio
-    logger.info(f"Generating audio in {args.lang}...")
-    audio_path = generate_audio(text_data, args.lang)
+        # 2. Generate Audio
+        logger.info(f"Generating audio in {args.lang}...")
+        audio_path = generate_audio(text_data, args.lang)
     
     if not audio_path or not os.path.exists(audio_path):
         logger.error("Failed to generate audio.")
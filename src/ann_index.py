@@ -0,0 +1,133 @@
+import time
+import math
+import logging
+import faiss
+import numpy as np
+from src.config import (
+    ANN_FLAT_MAX_VECTORS, ANN_IVF_MIN_VECTORS, ANN_COMPRESSION, ANN_TARGET_RECALL,
+)
+
+logger = logging.getLogger("ANNIndex")
+
+HNSW_NEIGHBOURS = 32
+HNSW_EF_SEARCH_SWEEP = [16, 32, 64, 128, 256]
+IVF_NPROBE_SWEEP = [1, 2, 4, 8, 16, 32, 64, 128]
+TUNING_QUERIES = 200
+RECALL_K = 10
+
+
+def optimize_vector_store(store, compression=ANN_COMPRESSION, target_recall=ANN_TARGET_RECALL):
+    """
+    Replaces a LangChain FAISS store's flat index with an ANN index sized to the corpus.
+    Small corpora keep the exact flat index. Medium corpora use HNSW and large ones
+    use IVF; PQ compression always implies IVF. The search parameter is tuned against
+    exact results, and a recall-vs-latency report is logged.
+
+    Args:
+        store: LangChain FAISS vector store holding a flat index.
+        compression (str, optional): None, "fp16" (scalar quantized) or "pq" (product quantized).
+        target_recall (float): Recall@10 the tuned search parameter must reach.
+
+    Returns:
+        dict: Report with the chosen "index_type", "search_params" and the tuning "sweep".
+    """
+    n = store.index.ntotal
+    if n <= ANN_FLAT_MAX_VECTORS:
+        return {"index_type": "flat", "search_params": {}, "sweep": []}
+
+    vectors = store.index.reconstruct_n(0, n)
+    d = vectors.shape[1]
+    start = time.perf_counter()
+
+    if n < ANN_IVF_MIN_VECTORS and compression != "pq":
+        index_type = "hnsw-fp16" if compression == "fp16" else "hnsw"
+        if compression == "fp16":
+            index = faiss.IndexHNSWSQ(d, faiss.ScalarQuantizer.QT_fp16, HNSW_NEIGHBOURS)
+            index.train(vectors)
+        else:
+            index = faiss.IndexHNSWFlat(d, HNSW_NEIGHBOURS)
+        param, sweep_values = "efSearch", HNSW_EF_SEARCH_SWEEP
+    else:
+        nlist = int(4 * math.sqrt(n))
+        quantizer = faiss.IndexFlatL2(d)
+        if compression == "pq":
+            index_type = "ivf-pq"
+            index = faiss.IndexIVFPQ(quantizer, d, nlist, _pq_subquantizers(d), 8)
+        elif compression == "fp16":
+            index_type = "ivf-fp16"
+            index = faiss.IndexIVFScalarQuantizer(quantizer, d, nlist, faiss.ScalarQuantizer.QT_fp16)
+        else:
+            index_type = "ivf"
+            index = faiss.IndexIVFFlat(quantizer, d, nlist)
+        rng = np.random.default_rng(0)
+        sample = vectors[rng.choice(n, size=min(n, nlist * 64), replace=False)]
+        index.train(sample)
+        param, sweep_values = "nprobe", [p for p in IVF_NPROBE_SWEEP if p <= nlist]
+
+    index.add(vectors)
+    build_time = time.perf_counter() - start
+
+    sweep = _tune(store.index, index, vectors, param, sweep_values)
+    chosen = next((row for row in sweep if row["recall"] >= target_recall), sweep[-1])
+    search_params = {param: chosen[param]}
+    apply_search_params(index, search_params)
+
+    store.index = index
+    report = {"index_type": index_type, "search_params": search_params, "build_s": build_time, "sweep": sweep}
+    _log_report(n, report)
+    return report
+
+
+def apply_search_params(index, search_params):
+    """Sets tuned search parameters, which FAISS does not persist with IVF indexes."""
+    for name, value in (search_params or {}).items():
+        if name == "efSearch":
+            index.hnsw.efSearch = value
+        elif name == "nprobe":
+            faiss.extract_index_ivf(index).nprobe = value
+
+
+def _tune(exact_index, index, vectors, param, sweep_values):
+    """
+    Measures recall@10 and per-query latency for each candidate parameter value.
+    Queries are sampled from the indexed vectors, so each query's own id is dropped from
+    both the exact and the ANN results; otherwise the trivial self-match inflates recall.
+    """
+    rng = np.random.default_rng(1)
+    query_ids = rng.choice(len(vectors), size=min(len(vectors), TUNING_QUERIES), replace=False)
+    queries = vectors[query_ids]
+    _, truth = exact_index.search(queries, RECALL_K + 1)
+    truth = [_without_self(row, query_id) for row, query_id in zip(truth, query_ids)]
+
+    sweep = []
+    for value in sweep_values:
+        apply_search_params(index, {param: value})
+        start = time.perf_counter()
+        _, found = index.search(queries, RECALL_K + 1)
+        latency = (time.perf_counter() - start) / len(queries)
+        found = [_without_self(row, query_id) for row, query_id in zip(found, query_ids)]
+        recall = np.mean([len(t & f) / len(t) for t, f in zip(truth, found) if t])
+        sweep.append({param: value, "recall": float(recall), "latency_ms": latency * 1000})
+    return sweep
+
+
+def _without_self(ids, query_id):
+    """The first RECALL_K result ids other than the query itself (and FAISS's -1 padding)."""
+    return set([i for i in ids if i != query_id and i >= 0][:RECALL_K])
+
+
+def _pq_subquantizers(d):
+    """Largest sub-quantizer count of at most d/8 that divides the dimension."""
+    for m in range(max(1, d // 8), 0, -1):
+        if d % m == 0:
+            return m
+    return 1
+
+
+def _log_report(n, report):
+    lines = [f"Built {report['index_type']} index over {n} vectors in {report['build_s']:.1f}s "
+             f"(search params {report['search_params']}):"]
+    for row in report["sweep"]:
+        param, value = next((k, v) for k, v in row.items() if k not in ("recall", "latency_ms"))
+        lines.append(f"  {param}={value:<4} recall@{RECALL_K}={row['recall']:.3f} latency={row['latency_ms']:.3f}ms")
+    logger.info("\n".join(lines))
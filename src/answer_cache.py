@@ -0,0 +1,134 @@
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+import numpy as np
+from src.config import ANSWER_CACHE_THRESHOLD, ANSWER_CACHE_MAX_ENTRIES, ANSWER_CACHE_TTL, ANSWER_CACHE_PATH
+
+logger = logging.getLogger("AnswerCache")
+
+
+class AnswerCache:
+    """
+    Semantic cache of generated answers.
+    A query whose embedding is within `threshold` cosine similarity of a cached query,
+    asked against the same knowledge base version and age style, reuses the stored answer.
+    One instance is shared by every session, so entries and counters are guarded by a lock.
+    """
+
+    def __init__(self, threshold=ANSWER_CACHE_THRESHOLD, max_entries=ANSWER_CACHE_MAX_ENTRIES,
+                 ttl_seconds=ANSWER_CACHE_TTL, path=ANSWER_CACHE_PATH):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        if path:
+            self._load()
+
+    def lookup(self, query_vector, version, style):
+        """
+        Returns the cached answer closest to `query_vector`, or None on a miss.
+
+        Args:
+            query_vector: Embedding of the query.
+            version (str): Knowledge base version the answer must have been generated against.
+            style (str): Age style key the answer must have been generated with.
+        """
+        vector = _normalize(query_vector)
+        with self.lock:
+            self._expire()
+            candidates = [key for key, entry in self.entries.items()
+                          if entry["version"] == version and entry["style"] == style]
+            if candidates:
+                matrix = np.stack([self.entries[key]["vector"] for key in candidates])
+                similarities = matrix @ vector
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.threshold:
+                    key = candidates[best]
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return self.entries[key]["answer"]
+
+            self.misses += 1
+            return None
+
+    def store(self, query_vector, version, style, answer, persist=True):
+        """
+        Adds an answer, evicting the least recently used entries beyond `max_entries`.
+        With `persist=False` the file is not rewritten; call `save()` once after a batch of stores.
+        """
+        entry = {
+            "vector": _normalize(query_vector),
+            "version": version,
+            "style": style,
+            "answer": answer,
+            "created": time.time(),
+        }
+        with self.lock:
+            self.entries[uuid.uuid4().hex] = entry
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        if persist:
+            self.save()
+
+    def stats(self):
+        """Returns hit/miss counters and the current size."""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self.entries),
+            }
+
+    def _expire(self):
+        # Called with the lock held, or from __init__ before the cache is shared
+        cutoff = time.time() - self.ttl_seconds
+        for key in [key for key, entry in self.entries.items() if entry["created"] < cutoff]:
+            del self.entries[key]
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            for key, entry in data.items():
+                entry["vector"] = np.asarray(entry["vector"], dtype=np.float32)
+                self.entries[key] = entry
+            self._expire()
+            logger.info(f"Loaded {len(self.entries)} cached answers.")
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable answer cache {self.path}: {e}")
+            self.entries.clear()
+
+    def save(self):
+        """Writes the whole cache to `path` atomically (no-op for an in-memory cache)."""
+        if not self.path:
+            return
+        with self.lock:
+            data = {key: {**entry, "vector": entry["vector"].tolist()} for key, entry in self.entries.items()}
+        tmp_path = f"{self.path}.tmp-{uuid.uuid4().hex}"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"Failed to persist answer cache: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+def _normalize(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
@@ -0,0 +1,63 @@
+import wave
+import subprocess
+import numpy as np
+
+LIPSYNC_SAMPLE_RATE = 16000  # Wav2Lip's mel front-end works on 16 kHz mono
+
+
+class AudioClip:
+    """
+    Decoded mono PCM held in memory: float32 samples in [-1, 1] plus their sample rate.
+    Lets TTS output flow into the lip-sync renderer without writing or re-decoding files.
+    """
+
+    def __init__(self, samples, sample_rate=LIPSYNC_SAMPLE_RATE):
+        self.samples = np.asarray(samples, dtype=np.float32)
+        self.sample_rate = sample_rate
+
+    @property
+    def duration(self):
+        return len(self.samples) / self.sample_rate
+
+    @classmethod
+    def from_encoded(cls, data, sample_rate=LIPSYNC_SAMPLE_RATE):
+        """Decodes compressed audio bytes (e.g. MP3 from edge-tts) through an ffmpeg pipe."""
+        result = subprocess.run(
+            ["ffmpeg", "-i", "pipe:0", "-f", "s16le", "-acodec", "pcm_s16le", "-ac", "1",
+             "-ar", str(sample_rate), "pipe:1", "-loglevel", "error"],
+            input=data, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True,
+        )
+        return cls.from_pcm16(result.stdout, sample_rate)
+
+    @classmethod
+    def from_file(cls, path, sample_rate=LIPSYNC_SAMPLE_RATE):
+        with open(path, "rb") as f:
+            return cls.from_encoded(f.read(), sample_rate)
+
+    @classmethod
+    def from_pcm16(cls, data, sample_rate=LIPSYNC_SAMPLE_RATE):
+        return cls(np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0, sample_rate)
+
+    def resample(self, sample_rate):
+        """Returns the clip at `sample_rate` (resampled through an ffmpeg pipe), or itself if it already is."""
+        if sample_rate == self.sample_rate:
+            return self
+        result = subprocess.run(
+            ["ffmpeg", "-f", "s16le", "-ar", str(self.sample_rate), "-ac", "1", "-i", "pipe:0",
+             "-f", "s16le", "-acodec", "pcm_s16le", "-ar", str(sample_rate), "pipe:1", "-loglevel", "error"],
+            input=self.to_pcm16(), stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True,
+        )
+        return AudioClip.from_pcm16(result.stdout, sample_rate)
+
+    def to_pcm16(self):
+        """Returns the samples as little-endian signed 16-bit bytes."""
+        return (np.clip(self.samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+    def save_wav(self, path):
+        """Writes the clip as a 16-bit WAV file, for callers that need one on disk."""
+        with wave.open(path, "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(self.sample_rate)
+            f.writeframes(self.to_pcm16())
+        return path
@@ -0,0 +1,114 @@
+import os
+import uuid
+import logging
+import threading
+import numpy as np
+import cv2
+from src.config import AVATAR_CACHE_DIR
+from src.utils import file_sha256
+
+logger = logging.getLogger("AvatarCache")
+
+CACHE_VERSION = 1
+
+
+class PreparedAvatar:
+    """Everything Wav2Lip needs from a still avatar, computed once per image."""
+
+    def __init__(self, frame, box, face_input):
+        self.frame = frame              # Original BGR image, the background of every output frame
+        self.box = tuple(int(v) for v in box)  # (x1, y1, x2, y2) face box, where predictions are pasted
+        self.face_input = face_input    # (1, 6, size, size) float32: masked face + reference face
+
+    @property
+    def paste_size(self):
+        x1, y1, x2, y2 = self.box
+        return x2 - x1, y2 - y1
+
+
+class AvatarCache:
+    """
+    Prepares avatar images for lip-sync once: face detection, crop, resize, lower-half mask
+    and the 6-channel input tensor. Results are keyed by image content hash, kept in memory
+    and saved as .npz files so later phrases (and restarts) start straight at inference.
+    """
+
+    def __init__(self, detect_face, img_size=96, cache_dir=AVATAR_CACHE_DIR):
+        self.detect_face = detect_face
+        self.img_size = img_size
+        self.cache_dir = cache_dir
+        self.prepared = {}
+        self.hashes = {}
+        self.lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def prepare(self, image_path):
+        """
+        Returns the PreparedAvatar for an image, or None if it can't be read or has no face.
+        """
+        key = self._key_for(image_path)
+        with self.lock:
+            avatar = self.prepared.get(key)
+        if avatar is not None:
+            return avatar
+
+        avatar = self._load(key) or self._build(image_path)
+        if avatar is None:
+            return None
+        with self.lock:
+            self.prepared[key] = avatar
+        return avatar
+
+    def _key_for(self, image_path):
+        # Hash each file once per (mtime, size), so per-phrase calls skip re-reading the image
+        stat = os.stat(image_path)
+        signature = (os.path.abspath(image_path), stat.st_mtime_ns, stat.st_size)
+        with self.lock:
+            digest = self.hashes.get(signature)
+        if digest is None:
+            digest = file_sha256(image_path)
+            with self.lock:
+                self.hashes[signature] = digest
+        return f"{digest}-{self.img_size}-v{CACHE_VERSION}"
+
+    def _build(self, image_path):
+        frame = cv2.imread(image_path)
+        if frame is None:
+            return None
+        box = self.detect_face(frame)
+        if box is None:
+            return None
+        x1, y1, x2, y2 = box
+
+        face = cv2.resize(frame[y1:y2, x1:x2], (self.img_size, self.img_size))
+        masked = face.copy()
+        masked[self.img_size // 2:, :] = 0
+        face_input = np.concatenate((masked, face), axis=2)[None].astype(np.float32) / 255.
+        avatar = PreparedAvatar(frame, box, np.ascontiguousarray(face_input.transpose(0, 3, 1, 2)))
+
+        path = self._path(self._key_for(image_path))
+        tmp_path = f"{path}.tmp-{uuid.uuid4().hex}.npz"
+        try:
+            np.savez(tmp_path, frame=avatar.frame, box=np.array(avatar.box), face_input=avatar.face_input)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to save prepared avatar: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        logger.info(f"Prepared avatar {os.path.basename(image_path)} (face box {avatar.box}).")
+        return avatar
+
+    def _load(self, key):
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                return PreparedAvatar(data["frame"], data["box"], data["face_input"])
+        except Exception as e:
+            logger.warning(f"Discarding unreadable prepared avatar {key[:12]}: {e}")
+            os.remove(path)
+            return None
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.npz")
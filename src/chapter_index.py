@@ -0,0 +1,120 @@
+import os
+import re
+import json
+import uuid
+import bisect
+import logging
+from src.config import CHAPTER_INDEX_DIR
+
+logger = logging.getLogger("ChapterIndex")
+
+INDEX_VERSION = 2
+# Word boundaries keep "Chapter 1" from matching the start of "Chapter 10"
+_HEADING = re.compile(r"\b(?:Chapter|CHAPTER|Adhyay|ADHYAY) (\d+)\b")
+# Same as the original heuristic: the next heading must be at least this far past the start
+MIN_CHAPTER_CHARS = 100
+
+
+class ChapterIndex:
+    """
+    Cleaned book text plus a table of every chapter heading, built in one regex pass.
+    Each heading records its character offset and the (zero-based) page it sits on,
+    so any chapter is sliced straight out of the text without re-parsing the PDF.
+    """
+
+    def __init__(self, text, page_offsets, headings):
+        self.text = text
+        self.page_offsets = page_offsets  # [(offset, page_index)] in text order
+        self.headings = headings          # {chapter_number: [offset, ...]} sorted
+
+    @classmethod
+    def build(cls, page_texts):
+        """
+        Builds the index from cleaned (page_index, text) pieces in reading order, whose
+        concatenation is the book text and each of which starts where its page starts.
+        """
+        parts, page_offsets, offset = [], [], 0
+        for page_index, text in page_texts:
+            page_offsets.append((offset, page_index))
+            parts.append(text)
+            offset += len(text)
+        text = "".join(parts)
+
+        headings = {}
+        for match in _HEADING.finditer(text):
+            headings.setdefault(int(match.group(1)), []).append(match.start())
+        return cls(text, page_offsets, headings)
+
+    def chapter(self, chapter_number):
+        """Returns the text of a chapter, or None if no heading for it was found."""
+        bounds = self.bounds(chapter_number)
+        if bounds is None:
+            return None
+        start, end = bounds
+        return self.text[start:end].strip()
+
+    def bounds(self, chapter_number):
+        """Returns (start, end) offsets of a chapter, or None if it has no heading."""
+        starts = self.headings.get(chapter_number)
+        if not starts:
+            return None
+        start = starts[0]
+        following = self.headings.get(chapter_number + 1, [])
+        i = bisect.bisect_left(following, start + MIN_CHAPTER_CHARS)
+        end = following[i] if i < len(following) else len(self.text)
+        return start, end
+
+    def page_of(self, offset):
+        """Returns the zero-based page index holding a text offset."""
+        i = bisect.bisect_right([start for start, _ in self.page_offsets], offset) - 1
+        return self.page_offsets[max(i, 0)][1] if self.page_offsets else 0
+
+    def table(self):
+        """Returns [(chapter_number, start_page, end_page)] for every chapter found."""
+        rows = []
+        for number in sorted(self.headings):
+            start, end = self.bounds(number)
+            rows.append((number, self.page_of(start), self.page_of(max(start, end - 1))))
+        return rows
+
+    def save(self, key, cache_dir=CHAPTER_INDEX_DIR):
+        """Writes the text and table as a sidecar pair named after `key` (the PDF hash)."""
+        os.makedirs(cache_dir, exist_ok=True)
+        text_path, table_path = _sidecar_paths(key, cache_dir)
+        for path, write in ((text_path, lambda f: f.write(self.text)),
+                            (table_path, lambda f: json.dump(self._manifest(), f))):
+            tmp_path = f"{path}.tmp-{uuid.uuid4().hex}"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                write(f)
+            os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, key, cache_dir=CHAPTER_INDEX_DIR):
+        """Returns the saved index for `key`, or None if it is missing or unreadable."""
+        text_path, table_path = _sidecar_paths(key, cache_dir)
+        if not (os.path.exists(text_path) and os.path.exists(table_path)):
+            return None
+        try:
+            with open(table_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+            with open(text_path, encoding="utf-8") as f:
+                text = f.read()
+            if manifest.get("version") != INDEX_VERSION or manifest.get("length") != len(text):
+                raise ValueError("stale or truncated sidecar")
+            headings = {int(number): offsets for number, offsets in manifest["headings"].items()}
+            return cls(text, [tuple(entry) for entry in manifest["pages"]], headings)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable chapter index {key[:12]}: {e}")
+            return None
+
+    def _manifest(self):
+        return {
+            "version": INDEX_VERSION,
+            "length": len(self.text),
+            "pages": self.page_offsets,
+            "headings": {str(number): offsets for number, offsets in self.headings.items()},
+        }
+
+
+def _sidecar_paths(key, cache_dir):
+    return os.path.join(cache_dir, f"{key}.txt"), os.path.join(cache_dir, f"{key}.json")
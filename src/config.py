@@ -5,6 +5,7 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 ASSETS_DIR = os.path.join(BASE_DIR, "assets")
 OUTPUT_DIR = os.path.join(BASE_DIR, "outputs")
 WAV2LIP_DIR = os.path.join(BASE_DIR, "Wav2Lip")
+CACHE_DIR = os.path.join(BASE_DIR, "cache")
 
 # Ensure output directory exists
 os.makedirs(OUTPUT_DIR, exist_ok=True)
@@ -15,10 +16,66 @@ DEFAULT_AVATAR_PATH = os.path.join(ASSETS_DIR, "krishna.jpg")
 # --- Wav2Lip Settings ---
 WAV2LIP_CHECKPOINT = os.path.join(WAV2LIP_DIR, "checkpoints", "wav2lip_gan.pth")
 WAV2LIP_INFERENCE_SCRIPT = os.path.join(WAV2LIP_DIR, "inference.py")
+MEL_BACKEND = "numpy"            # STFT for the live lip-sync mel front-end: "numpy" or "torch"
+VIDEO_PRESET = "veryfast"        # x264 preset for lip-sync clips
+VIDEO_CRF = 23                   # x264 quality (lower is better, larger)
+AVATAR_CACHE_DIR = os.path.join(CACHE_DIR, "avatars")  # Face box, crop and input tensor per avatar image
+MEL_CACHE_ENTRIES = 64           # Mel batches kept in memory, keyed by audio content hash
+
+# --- PDF Extraction Settings ---
+PDF_WORKERS = None               # Page extraction processes (None = one per CPU core)
+PDF_PAGES_PER_TASK = 8           # Pages handed to a worker at a time; at most 2 tasks per worker are in flight
+PAGE_CACHE_DIR = os.path.join(CACHE_DIR, "pages")  # Extracted page text per PDF hash, shared by narration and RAG
+PAGE_CACHE_MAX_BYTES = 512 * 1024 ** 2  # Evict least recently used documents above 512 MB
+CHAPTER_INDEX_DIR = os.path.join(CACHE_DIR, "chapters")  # Cleaned text + chapter table per PDF hash
 
 # --- TTS Settings ---
-AUDIO_OUTPUT_FILENAME = "output_audio.mp3"
 # Voices: https://github.com/rany2/edge-tts
 VOICE_EN = "en-IN-PrabhatNeural" # Indian English
 VOICE_HI = "hi-IN-MadhurNeural"  # Hindi
 TTS_CHUNK_SIZE = 2000            # Characters per TTS chunk
+TTS_SEGMENT_CHARS = 300          # Longest streamed segment; longer sentences are broken at clauses
+TTS_LOOKAHEAD = 2                # Segments synthesised ahead of the one being played
+TTS_MAX_CONCURRENCY = 4          # Chunks synthesised at once per generate_audio call
+TTS_BACKEND = "edge"             # "edge" (edge-tts service) or "local" (offline silent stand-in for tests)
+LOCAL_TTS_WORDS_PER_SECOND = 2.5 # Speaking rate the local stand-in uses to size its clips
+TTS_CACHE_DIR = os.path.join(CACHE_DIR, "tts")  # Synthesised clips keyed by text, voice and format
+TTS_CACHE_MAX_BYTES = 256 * 1024 ** 2  # Evict least recently used clips above 256 MB
+TTS_SEGMENT_FILES_MAX_BYTES = 64 * 1024 ** 2  # Streamed sentence files kept in OUTPUT_DIR for replay
+
+# --- RAG Settings ---
+EMBEDDING_MODEL_ID = "sentence-transformers/all-MiniLM-L6-v2"
+EMBEDDING_BACKEND = "torch"      # "torch" (HuggingFaceEmbeddings) or "onnx" (ONNX Runtime CPU)
+EMBEDDING_ONNX_QUANTIZE = False  # Run the ONNX embedding model with int8 weights
+ONNX_MODEL_DIR = os.path.join(CACHE_DIR, "onnx")
+LLM_MODEL_ID = "MBZUAI/LaMini-T5-738M"
+LLM_DRAFT_MODEL_ID = None        # e.g. "MBZUAI/LaMini-T5-61M" to enable assisted (speculative) decoding
+LLM_PRECISION = "fp32"           # "fp32", "int8" (dynamic quantization of Linear layers) or "bf16"
+LLM_MAX_INPUT_TOKENS = 512       # T5 input window the prompt is packed into
+RAG_BATCH_SIZE = 8               # Prompts decoded together by answer_questions
+CHUNK_SIZE = 1000                # Characters per text chunk
+CHUNK_OVERLAP = 100              # Characters shared by neighbouring chunks
+INGEST_STREAMING = True          # Parse, split and embed PDFs in a bounded-memory pipeline
+EMBED_BATCH_SIZE = 64            # Chunks embedded per batch while streaming
+
+# --- Index Cache Settings ---
+INDEX_CACHE_DIR = os.path.join(CACHE_DIR, "indexes")
+INDEX_CACHE_MAX_BYTES = 2 * 1024 ** 3  # Evict least recently used indexes above 2 GB
+EMBEDDING_CACHE_DIR = os.path.join(CACHE_DIR, "embeddings")
+EMBEDDING_CACHE_MAX_ROWS = 250000      # ~370 MB of 384-dim float32 chunk vectors
+
+# --- Answer Cache Settings ---
+ANSWER_CACHE_THRESHOLD = 0.95    # Cosine similarity at which a cached answer is reused
+ANSWER_CACHE_MAX_ENTRIES = 512
+ANSWER_CACHE_TTL = 24 * 3600     # Seconds before a cached answer expires
+ANSWER_CACHE_PATH = os.path.join(CACHE_DIR, "answers.json")  # None keeps the cache in memory only
+
+# --- ANN Index Settings ---
+ANN_FLAT_MAX_VECTORS = 20000     # Corpora up to this many chunks keep an exact flat index
+ANN_IVF_MIN_VECTORS = 200000     # Corpora from this size use IVF instead of HNSW
+ANN_COMPRESSION = None           # None, "fp16" or "pq" for compressed vector storage
+ANN_TARGET_RECALL = 0.95         # Recall@10 the tuned search parameter must reach
+
+# --- Hybrid Retrieval Settings ---
+HYBRID_RETRIEVAL = True          # Fuse BM25 with vector search instead of vector-only retrieval
+LEXICAL_DECISIVE_RATIO = 1.5     # BM25 winner must beat the runner-up by this factor to skip vector search
@@ -0,0 +1,73 @@
+import logging
+
+logger = logging.getLogger("ContextPacker")
+
+MIN_OVERLAP_CHARS = 20     # Shorter shared spans are treated as coincidence, not splitter overlap
+MAX_OVERLAP_CHARS = 400    # Longest span checked when matching chunk edges
+
+
+def pack_context(docs, tokenizer, token_budget):
+    """
+    Packs retrieved chunks into a context that fits an exact token budget.
+    Chunks are taken in relevance order. Text already covered by a higher ranked chunk
+    (duplicates and splitter overlap at chunk edges) is dropped, and the last chunk
+    that does not fit is cut at a token boundary.
+
+    Args:
+        docs (list): LangChain Documents, most relevant first.
+        tokenizer: Hugging Face tokenizer of the generating model.
+        token_budget (int): Maximum number of context tokens.
+
+    Returns:
+        tuple: (context_text, token_count)
+    """
+    pieces = []
+    selected = []
+    used = 0
+    for doc in docs:
+        if used >= token_budget:
+            break
+        text = _strip_overlaps(doc.page_content.strip(), selected)
+        if not text:
+            continue
+        selected.append(doc.page_content.strip())
+
+        ids = tokenizer(text, add_special_tokens=False).input_ids
+        remaining = token_budget - used
+        if len(ids) > remaining:
+            text = tokenizer.decode(ids[:remaining], skip_special_tokens=True)
+            ids = ids[:remaining]
+        pieces.append(text)
+        used += len(ids)
+
+    context = "\n".join(pieces)
+    # Token merges across piece boundaries can shift the count slightly, so trim to the exact budget
+    ids = tokenizer(context, add_special_tokens=False).input_ids
+    if len(ids) > token_budget:
+        ids = ids[:token_budget]
+        context = tokenizer.decode(ids, skip_special_tokens=True)
+    return context, len(ids)
+
+
+def _strip_overlaps(text, selected):
+    """Removes the parts of `text` that already appear in the selected chunks."""
+    for other in selected:
+        if text in other:
+            return ""
+        head = _edge_overlap(other, text)
+        if head:
+            text = text[head:].lstrip()
+        tail = _edge_overlap(text, other)
+        if tail:
+            text = text[:-tail].rstrip()
+        if not text:
+            return ""
+    return text
+
+
+def _edge_overlap(first, second):
+    """Length of the longest suffix of `first` that is also a prefix of `second`."""
+    for size in range(min(len(first), len(second), MAX_OVERLAP_CHARS), MIN_OVERLAP_CHARS - 1, -1):
+        if first.endswith(second[:size]):
+            return size
+    return 0
@@ -0,0 +1,193 @@
+import os
+import json
+import uuid
+import hashlib
+import logging
+import threading
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from src.config import EMBEDDING_CACHE_DIR, EMBEDDING_CACHE_MAX_ROWS
+
+logger = logging.getLogger("EmbeddingCache")
+
+KEY_BYTES = 16
+META_FILE = "meta.json"
+VECTORS_FILE = "vectors.f32"
+KEYS_FILE = "keys.bin"
+TICKS_FILE = "ticks.i64"
+
+
+class EmbeddingCache:
+    """
+    Persistent map from chunk text hash to embedding vector.
+    Vectors live in a memory-mapped float32 matrix with parallel key and last-used arrays,
+    so the cache is shared across documents and revisions without loading it into RAM.
+    Above `max_rows`, the least recently used rows are compacted away.
+    """
+
+    def __init__(self, namespace, cache_dir=EMBEDDING_CACHE_DIR, max_rows=EMBEDDING_CACHE_MAX_ROWS):
+        self.dir = os.path.join(cache_dir, namespace.replace("/", "__"))
+        self.max_rows = max_rows
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.dim = None
+        self.rows = 0
+        self.capacity = 0
+        self.tick = 0
+        self.index = {}
+        self.vectors = self.keys = self.ticks = None
+        os.makedirs(self.dir, exist_ok=True)
+        self._open()
+
+    def get_many(self, texts):
+        """Returns a vector (or None on a miss) for each text."""
+        with self.lock:
+            self.tick += 1
+            found = []
+            for text in texts:
+                row = self.index.get(_digest(text))
+                if row is None:
+                    self.misses += 1
+                    found.append(None)
+                else:
+                    self.hits += 1
+                    self.ticks[row] = self.tick
+                    found.append(np.array(self.vectors[row]))
+            return found
+
+    def put_many(self, texts, vectors):
+        """Stores vectors for texts, growing the files and evicting as needed."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not len(vectors):
+            return
+        texts = list(texts)
+        if len(vectors) > self.max_rows:
+            # Only the newest max_rows fit; storing more would overshoot the cap
+            texts, vectors = texts[-self.max_rows:], vectors[-self.max_rows:]
+        with self.lock:
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+            if self.rows + len(vectors) > self.max_rows:
+                self._evict(keep=max(0, int(self.max_rows * 0.8) - len(vectors)))
+            self._reserve(self.rows + len(vectors))
+
+            self.tick += 1
+            for text, vector in zip(texts, vectors):
+                key = _digest(text)
+                if key in self.index:
+                    continue
+                row = self.rows
+                self.vectors[row] = vector
+                self.keys[row] = np.frombuffer(key, dtype=np.uint8)
+                self.ticks[row] = self.tick
+                self.index[key] = row
+                self.rows += 1
+            self._flush()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "rows": self.rows,
+        }
+
+    def _open(self):
+        meta_path = os.path.join(self.dir, META_FILE)
+        if not os.path.exists(meta_path):
+            return
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            self.dim, self.rows, self.capacity, self.tick = meta["dim"], meta["rows"], meta["capacity"], meta["tick"]
+            self._map()
+            self.index = {self.keys[row].tobytes(): row for row in range(self.rows)}
+            logger.info(f"Opened embedding cache with {self.rows} vectors.")
+        except Exception as e:
+            logger.warning(f"Resetting unreadable embedding cache {self.dir}: {e}")
+            self.dim, self.rows, self.capacity, self.tick = None, 0, 0, 0
+            self.vectors = self.keys = self.ticks = None
+            self.index = {}
+            for name in (META_FILE, VECTORS_FILE, KEYS_FILE, TICKS_FILE):
+                path = os.path.join(self.dir, name)
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def _map(self):
+        """(Re)opens the memory maps at the current capacity."""
+        specs = [
+            (VECTORS_FILE, np.float32, (self.capacity, self.dim)),
+            (KEYS_FILE, np.uint8, (self.capacity, KEY_BYTES)),
+            (TICKS_FILE, np.int64, (self.capacity,)),
+        ]
+        maps = []
+        for name, dtype, shape in specs:
+            path = os.path.join(self.dir, name)
+            size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            with open(path, "ab") as f:
+                f.truncate(size)
+            maps.append(np.memmap(path, dtype=dtype, mode="r+", shape=shape))
+        self.vectors, self.keys, self.ticks = maps
+
+    def _reserve(self, rows):
+        if rows <= self.capacity:
+            return
+        self._flush()
+        self.vectors = self.keys = self.ticks = None
+        self.capacity = max(rows, self.capacity * 2, 1024)
+        self._map()
+
+    def _evict(self, keep):
+        """Compacts the files down to the `keep` most recently used rows."""
+        if self.rows <= keep:
+            return
+        order = np.argsort(-self.ticks[:self.rows], kind="stable")[:keep]
+        order.sort()
+        vectors, keys, ticks = (np.array(a[:self.rows][order]) for a in (self.vectors, self.keys, self.ticks))
+        self.vectors[:keep], self.keys[:keep], self.ticks[:keep] = vectors, keys, ticks
+        logger.info(f"Evicted {self.rows - keep} cached embeddings.")
+        self.rows = keep
+        self.index = {self.keys[row].tobytes(): row for row in range(self.rows)}
+
+    def _flush(self):
+        for array in (self.vectors, self.keys, self.ticks):
+            if array is not None:
+                array.flush()
+        # Written atomically: a torn meta.json would make _open reset the whole cache
+        meta_path = os.path.join(self.dir, META_FILE)
+        tmp_path = f"{meta_path}.tmp-{uuid.uuid4().hex}"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({"dim": self.dim, "rows": self.rows, "capacity": self.capacity, "tick": self.tick}, f)
+            os.replace(tmp_path, meta_path)
+        except OSError as e:
+            logger.error(f"Failed to write embedding cache metadata: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that only embeds chunk texts missing from an EmbeddingCache."""
+
+    def __init__(self, embeddings, cache):
+        self.embeddings = embeddings
+        self.cache = cache
+
+    def embed_documents(self, texts):
+        vectors = self.cache.get_many(texts)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            new_vectors = self.embeddings.embed_documents([texts[i] for i in missing])
+            self.cache.put_many([texts[i] for i in missing], new_vectors)
+            for i, vector in zip(missing, new_vectors):
+                vectors[i] = vector
+        return [vector.tolist() if isinstance(vector, np.ndarray) else vector for vector in vectors]
+
+    def embed_query(self, text):
+        return self.embeddings.embed_query(text)
+
+
+def _digest(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=KEY_BYTES).digest()
@@ -0,0 +1,110 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import logging
+from langchain_community.vectorstores import FAISS
+from src.config import INDEX_CACHE_DIR, INDEX_CACHE_MAX_BYTES
+from src.utils import file_sha256, touch, evict_lru
+from src.ann_index import apply_search_params
+from src.lexical_index import BM25Index
+
+logger = logging.getLogger("IndexCache")
+
+MANIFEST_FILE = "manifest.json"
+LEXICAL_FILE = "bm25.json"
+
+
+class IndexCache:
+    """
+    On-disk store of FAISS indexes keyed by PDF content and ingestion parameters.
+    Each entry is a directory holding the FAISS index, its docstore and a manifest.
+    """
+
+    def __init__(self, cache_dir=INDEX_CACHE_DIR, max_bytes=INDEX_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key_for(self, pdf_path, **params):
+        """
+        Builds a cache key from the file contents and the parameters that shape the index.
+
+        Args:
+            pdf_path (str): Path to the PDF file.
+            **params: Chunking and embedding settings (chunk_size, embedding_model, ...).
+
+        Returns:
+            str: Hex digest identifying the index.
+        """
+        payload = json.dumps({"file": file_sha256(pdf_path), **params}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def load(self, key, embeddings):
+        """Returns the cached vector store for `key`, or None on a miss or a corrupt entry."""
+        entry_dir = self._entry_dir(key)
+        if not os.path.isdir(entry_dir):
+            return None
+
+        try:
+            with open(os.path.join(entry_dir, MANIFEST_FILE)) as f:
+                manifest = json.load(f)
+            if manifest.get("key") != key:
+                raise ValueError("manifest key mismatch")
+            store = FAISS.load_local(entry_dir, embeddings, allow_dangerous_deserialization=True)
+            apply_search_params(store.index, manifest.get("search_params"))
+        except Exception as e:
+            logger.warning(f"Discarding corrupt index cache entry {key[:12]}: {e}")
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            return None
+
+        touch(entry_dir)
+        logger.info(f"Loaded cached index {key[:12]}.")
+        return store
+
+    def load_lexical(self, key):
+        """Returns the BM25 index saved alongside the vector store for `key`, or None."""
+        path = os.path.join(self._entry_dir(key), LEXICAL_FILE)
+        if not os.path.exists(path):
+            return None
+        try:
+            return BM25Index.load(path)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable BM25 index for {key[:12]}: {e}")
+            return None
+
+    def save(self, key, store, search_params=None, lexical_index=None):
+        """
+        Writes `store` (and its BM25 index) under `key` atomically, then evicts old entries
+        over the size budget. `search_params` (e.g. a tuned nprobe) are kept in the manifest
+        and re-applied on load.
+        """
+        entry_dir = self._entry_dir(key)
+        tmp_dir = f"{entry_dir}.tmp-{uuid.uuid4().hex}"
+        try:
+            store.save_local(tmp_dir)
+            if lexical_index is not None:
+                lexical_index.save(os.path.join(tmp_dir, LEXICAL_FILE))
+            with open(os.path.join(tmp_dir, MANIFEST_FILE), "w") as f:
+                json.dump({"key": key, "created": time.time(), "search_params": search_params or {}}, f)
+
+            if os.path.isdir(entry_dir):
+                shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(tmp_dir, entry_dir)
+        except Exception as e:
+            logger.error(f"Failed to save index cache entry {key[:12]}: {e}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+
+        self._evict()
+
+    def _entry_dir(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def _evict(self):
+        """Removes least recently used entries until the cache fits in `max_bytes`."""
+        entries = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir) if ".tmp-" not in name]
+        for path in evict_lru([path for path in entries if os.path.isdir(path)], self.max_bytes):
+            logger.info(f"Evicted index cache entry {os.path.basename(path)[:12]}.")
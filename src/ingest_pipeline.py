@@ -0,0 +1,63 @@
+import logging
+from langchain_core.documents import Document
+from langchain_community.vectorstores import FAISS
+from src.pdf_extractor import iter_page_texts, get_page_count
+from src.config import EMBED_BATCH_SIZE
+
+logger = logging.getLogger("IngestPipeline")
+
+
+def stream_ingest(pdf_path, embeddings, text_splitter, batch_size=EMBED_BATCH_SIZE,
+                  workers=None, progress_callback=None):
+    """
+    Builds a FAISS vector store from a PDF in stages without holding the whole document.
+    Pages are parsed in a process pool, split into chunks as they arrive, and embedded
+    in fixed-size batches that are appended to the index as they fill.
+
+    Args:
+        pdf_path (str): Path to the PDF file.
+        embeddings: LangChain embeddings used for the chunks.
+        text_splitter: Splitter applied to each page.
+        batch_size (int): Chunks embedded per batch.
+        workers (int, optional): Page parsing processes. Defaults to the CPU count.
+        progress_callback (callable, optional): Called as fn(pages_done, total_pages, chunks_done).
+
+    Returns:
+        FAISS: The populated vector store, or None if the PDF held no text.
+    """
+    total_pages = get_page_count(pdf_path)
+    vector_store = None
+    batch = []
+    pages_done = 0
+    chunks_done = 0
+
+    def flush():
+        nonlocal vector_store, chunks_done
+        texts = [doc.page_content for doc in batch]
+        metadatas = [doc.metadata for doc in batch]
+        vectors = embeddings.embed_documents(texts)
+        if vector_store is None:
+            vector_store = FAISS.from_embeddings(list(zip(texts, vectors)), embeddings, metadatas=metadatas)
+        else:
+            vector_store.add_embeddings(list(zip(texts, vectors)), metadatas=metadatas)
+        chunks_done += len(batch)
+        batch.clear()
+
+    for page_index, text in iter_page_texts(pdf_path, workers=workers):
+        pages_done += 1
+        if text.strip():
+            page = Document(page_content=text, metadata={"source": pdf_path, "page": page_index})
+            for chunk in text_splitter.split_documents([page]):
+                batch.append(chunk)
+                if len(batch) >= batch_size:
+                    flush()
+        if progress_callback:
+            progress_callback(pages_done, total_pages, chunks_done)
+
+    if batch:
+        flush()
+    if progress_callback:
+        progress_callback(pages_done, total_pages, chunks_done)
+
+    logger.info(f"Streamed {pages_done} pages into {chunks_done} chunks.")
+    return vector_store
@@ -0,0 +1,192 @@
+import os
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from src.config import LEXICAL_DECISIVE_RATIO
+
+RRF_K = 60  # Reciprocal rank fusion damping constant
+
+logger = logging.getLogger("KnowledgeBase")
+
+
+class KnowledgeBase:
+    """
+    A library of documents, each held in its own FAISS shard.
+    Documents are added and removed independently; queries are embedded once,
+    searched against every shard in parallel and merged into a single top-k.
+    """
+
+    def __init__(self, embeddings, max_workers=None):
+        self.embeddings = embeddings
+        self.shards = {}
+        self.sources = {}
+        self.lexical = {}
+        self.last_search_mode = None
+        self._pool = ThreadPoolExecutor(max_workers=max_workers or min(8, os.cpu_count() or 1))
+
+    def __len__(self):
+        return len(self.shards)
+
+    def __contains__(self, doc_id):
+        return doc_id in self.shards
+
+    @property
+    def version(self):
+        """Identifies the current set of documents; changes whenever one is added or removed."""
+        return hashlib.sha256("|".join(sorted(self.shards)).encode("utf-8")).hexdigest()
+
+    def add_document(self, doc_id, vector_store, source=None, lexical_index=None):
+        """Registers (or replaces) the shard for a document, with its optional BM25 index."""
+        self.shards[doc_id] = vector_store
+        self.sources[doc_id] = source
+        if lexical_index is not None:
+            self.lexical[doc_id] = lexical_index
+        logger.info(f"Added document {source or doc_id[:12]} ({len(self.shards)} in library).")
+
+    def remove_document(self, doc_id):
+        """Drops a document's shard. Returns True if it was present."""
+        if self.shards.pop(doc_id, None) is None:
+            return False
+        source = self.sources.pop(doc_id, None)
+        self.lexical.pop(doc_id, None)
+        logger.info(f"Removed document {source or doc_id[:12]} ({len(self.shards)} in library).")
+        return True
+
+    def search(self, query, k=5):
+        """
+        Finds the k chunks closest to the query across all documents.
+
+        Args:
+            query (str): The user's question.
+            k (int): Number of chunks to return.
+
+        Returns:
+            list: LangChain Documents ordered from most to least similar.
+        """
+        return self.search_by_vector(self.embeddings.embed_query(query), k)
+
+    def search_by_vector(self, query_vector, k=5):
+        """Same as `search`, for a query that has already been embedded."""
+        return [self._doc_at(doc_id, position) for _, doc_id, position in self._vector_hits([query_vector], k)[0]]
+
+    def search_batch(self, query_vectors, k=5):
+        """
+        Finds the k closest chunks for many queries with one FAISS search per shard.
+
+        Args:
+            query_vectors (list): Embedded queries.
+            k (int): Number of chunks to return per query.
+
+        Returns:
+            list: One list of LangChain Documents per query, most similar first.
+        """
+        return [[self._doc_at(doc_id, position) for _, doc_id, position in hits]
+                for hits in self._vector_hits(query_vectors, k)]
+
+    def hybrid_search(self, query, k=5, query_vector=None):
+        """
+        Combines BM25 and vector retrieval with reciprocal rank fusion.
+        When the lexical match is decisive (a clear BM25 winner containing every content
+        term, e.g. a verse or part number) the lexical hits are returned without a vector search.
+
+        Args:
+            query (str): The user's question.
+            k (int): Number of chunks to return.
+            query_vector (list, optional): Precomputed query embedding; computed only if needed.
+
+        Returns:
+            list: LangChain Documents, best first.
+        """
+        return self.hybrid_search_batch([query], k, None if query_vector is None else [query_vector])[0]
+
+    def hybrid_search_batch(self, queries, k=5, query_vectors=None):
+        """
+        Hybrid retrieval for many queries: BM25 per query, then one batched vector search
+        for the queries whose lexical match is not decisive.
+
+        Args:
+            queries (list): The user's questions.
+            k (int): Number of chunks to return per query.
+            query_vectors (list, optional): Precomputed query embeddings, in the same order.
+
+        Returns:
+            list: One list of LangChain Documents per query, best first.
+        """
+        if not self.shards:
+            return [[] for _ in queries]
+
+        results = [None] * len(queries)
+        lexical_per_query = []
+        needs_vectors = []
+        for row, query in enumerate(queries):
+            lexical_hits = self._lexical_hits(query, k)
+            lexical_per_query.append(lexical_hits)
+            if self._is_decisive(query, lexical_hits):
+                results[row] = [self._doc_at(doc_id, position) for _, doc_id, position in lexical_hits[:k]]
+            else:
+                needs_vectors.append(row)
+
+        self.last_search_mode = "lexical" if not needs_vectors else "hybrid"
+        if not needs_vectors:
+            return results
+
+        if query_vectors is None:
+            vectors = self.embeddings.embed_documents([queries[row] for row in needs_vectors])
+        else:
+            vectors = [query_vectors[row] for row in needs_vectors]
+        for row, vector_hits in zip(needs_vectors, self._vector_hits(vectors, k)):
+            results[row] = self._fuse(lexical_per_query[row][:k], vector_hits, k)
+        return results
+
+    def _lexical_hits(self, query, k):
+        """BM25 (score, doc_id, position) hits across every document, best first."""
+        hits = []
+        for doc_id, lexical in self.lexical.items():
+            hits.extend((score, doc_id, position) for position, score in lexical.search(query, k))
+        hits.sort(key=lambda hit: hit[0], reverse=True)
+        return hits
+
+    def _fuse(self, lexical_hits, vector_hits, k):
+        """Reciprocal rank fusion of two ranked hit lists into the top-k Documents."""
+        fused = {}
+        for hits in (lexical_hits, vector_hits):
+            for rank, (_, doc_id, position) in enumerate(hits):
+                fused[(doc_id, position)] = fused.get((doc_id, position), 0.0) + 1.0 / (RRF_K + rank + 1)
+        ranked = sorted(fused, key=fused.get, reverse=True)[:k]
+        return [self._doc_at(doc_id, position) for doc_id, position in ranked]
+
+    def _is_decisive(self, query, lexical_hits):
+        if not lexical_hits:
+            return False
+        top_score, doc_id, position = lexical_hits[0]
+        runner_up = lexical_hits[1][0] if len(lexical_hits) > 1 else 0.0
+        return (top_score >= LEXICAL_DECISIVE_RATIO * runner_up
+                and self.lexical[doc_id].matches_all(query, position))
+
+    def _vector_hits(self, query_vectors, k):
+        """Runs one FAISS search per shard and returns, per query, the merged (distance, doc_id, position) top-k."""
+        if not self.shards:
+            return [[] for _ in query_vectors]
+
+        matrix = np.asarray(query_vectors, dtype=np.float32)
+        shard_results = self._pool.map(
+            lambda item: (item[0], *item[1].index.search(matrix, k)),
+            list(self.shards.items()),
+        )
+
+        merged = [[] for _ in query_vectors]
+        for doc_id, distances, indices in shard_results:
+            for row, (row_distances, row_indices) in enumerate(zip(distances, indices)):
+                for distance, position in zip(row_distances, row_indices):
+                    # FAISS pads with -1 when a shard has fewer than k chunks
+                    if position == -1:
+                        continue
+                    merged[row].append((float(distance), doc_id, int(position)))
+
+        # FAISS scores are L2 distances: lower is closer
+        return [sorted(hits, key=lambda hit: hit[0])[:k] for hits in merged]
+
+    def _doc_at(self, doc_id, position):
+        store = self.shards[doc_id]
+        return store.docstore.search(store.index_to_docstore_id[position])
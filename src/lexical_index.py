@@ -0,0 +1,108 @@
+import re
+import json
+import math
+import bisect
+import logging
+import numpy as np
+
+logger = logging.getLogger("LexicalIndex")
+
+# Keeps verse and part numbers such as "2.47" or "A-113" together as single terms
+_TOKEN = re.compile(r"\w+(?:[.\-:/]\w+)*")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "did", "do", "does", "for", "from", "how",
+    "in", "is", "it", "me", "of", "on", "or", "say", "says", "tell", "that", "the", "this", "to", "was",
+    "what", "when", "where", "which", "who", "why", "with", "about", "explain", "please",
+}
+
+
+def tokenize(text):
+    return _TOKEN.findall(text.lower())
+
+
+class BM25Index:
+    """
+    Okapi BM25 inverted index over the chunks of one vector store.
+    Positions match the FAISS index positions, so hits map straight to docstore entries.
+    """
+
+    def __init__(self, postings, doc_lengths, k1=1.5, b=0.75):
+        self.postings = postings
+        self.doc_lengths = np.asarray(doc_lengths, dtype=np.float32)
+        self.k1 = k1
+        self.b = b
+        self.avg_length = float(self.doc_lengths.mean()) if len(self.doc_lengths) else 0.0
+        n = len(self.doc_lengths)
+        self.idf = {
+            term: math.log(1 + (n - len(positions) + 0.5) / (len(positions) + 0.5))
+            for term, (positions, _) in postings.items()
+        }
+
+    @classmethod
+    def from_texts(cls, texts):
+        """Builds the index from chunk texts in FAISS position order."""
+        postings = {}
+        doc_lengths = []
+        for position, text in enumerate(texts):
+            terms = tokenize(text)
+            doc_lengths.append(len(terms))
+            counts = {}
+            for term in terms:
+                counts[term] = counts.get(term, 0) + 1
+            for term, count in counts.items():
+                positions, frequencies = postings.setdefault(term, ([], []))
+                positions.append(position)
+                frequencies.append(count)
+        return cls(postings, doc_lengths)
+
+    @classmethod
+    def from_vector_store(cls, store):
+        """Builds the index from the chunks held by a LangChain FAISS store."""
+        ids = [store.index_to_docstore_id[i] for i in range(store.index.ntotal)]
+        return cls.from_texts([store.docstore.search(doc_id).page_content for doc_id in ids])
+
+    def search(self, query, k=5):
+        """
+        Scores every chunk containing a query term.
+
+        Returns:
+            list: (position, score) pairs, best first.
+        """
+        scores = np.zeros(len(self.doc_lengths), dtype=np.float32)
+        for term in set(tokenize(query)):
+            if term not in self.postings:
+                continue
+            positions, frequencies = self.postings[term]
+            positions = np.asarray(positions)
+            tf = np.asarray(frequencies, dtype=np.float32)
+            norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[positions] / self.avg_length)
+            scores[positions] += self.idf[term] * tf * (self.k1 + 1) / (tf + norm)
+
+        hits = np.flatnonzero(scores)
+        if len(hits) > k:
+            hits = hits[np.argpartition(-scores[hits], k)[:k]]
+        hits = hits[np.argsort(-scores[hits])]
+        return [(int(position), float(scores[position])) for position in hits]
+
+    def matches_all(self, query, position):
+        """True if the chunk at `position` contains every content term of the query."""
+        terms = [term for term in set(tokenize(query)) if term not in STOPWORDS]
+        for term in terms:
+            positions = self.postings.get(term, ([], []))[0]
+            i = bisect.bisect_left(positions, position)
+            if i == len(positions) or positions[i] != position:
+                return False
+        return bool(terms)
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump({"k1": self.k1, "b": self.b, "doc_lengths": self.doc_lengths.tolist(),
+                       "postings": self.postings}, f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        return cls({term: tuple(entry) for term, entry in data["postings"].items()},
+                   data["doc_lengths"], data["k1"], data["b"])
@@ -0,0 +1,151 @@
+import sys
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from src.config import WAV2LIP_DIR, MEL_BACKEND, MEL_CACHE_ENTRIES
+
+# Wav2Lip hparams (Wav2Lip/hparams.py) that shape the mel spectrogram
+SAMPLE_RATE = 16000
+N_FFT = 800
+HOP_SIZE = 200
+WIN_SIZE = 800
+NUM_MELS = 80
+PREEMPHASIS = 0.97
+FMIN = 55
+FMAX = 7600
+REF_LEVEL_DB = 20
+MIN_LEVEL_DB = -100
+MAX_ABS_VALUE = 4.0
+
+_mel_basis = None
+_mel_basis_lock = threading.Lock()
+
+
+def mel_basis():
+    """Returns Wav2Lip's (80, 401) mel filterbank, built by Wav2Lip's own audio module when available."""
+    global _mel_basis
+    with _mel_basis_lock:
+        if _mel_basis is None:
+            try:
+                if WAV2LIP_DIR not in sys.path:
+                    sys.path.append(WAV2LIP_DIR)
+                import Wav2Lip.audio as audio
+                _mel_basis = np.asarray(audio._build_mel_basis(), dtype=np.float32)
+            except ImportError:
+                import librosa
+                _mel_basis = librosa.filters.mel(sr=SAMPLE_RATE, n_fft=N_FFT, n_mels=NUM_MELS,
+                                                 fmin=FMIN, fmax=FMAX).astype(np.float32)
+        return _mel_basis
+
+
+def melspectrogram(wav, backend=MEL_BACKEND):
+    """
+    Vectorised equivalent of Wav2Lip's `audio.melspectrogram`: pre-emphasis, a centred
+    reflect-padded STFT with a periodic Hann window, mel projection, dB and symmetric normalisation.
+
+    Args:
+        wav (np.ndarray): Mono float samples at 16 kHz.
+        backend (str): "numpy" or "torch".
+
+    Returns:
+        np.ndarray: float32 array of shape (80, frames).
+    """
+    wav = np.asarray(wav, dtype=np.float32)
+    emphasised = np.empty_like(wav)
+    emphasised[:1] = wav[:1]
+    emphasised[1:] = wav[1:] - PREEMPHASIS * wav[:-1]
+
+    if backend == "torch":
+        magnitudes = _stft_magnitudes_torch(emphasised)
+    else:
+        magnitudes = _stft_magnitudes_numpy(emphasised)
+
+    mel = mel_basis() @ magnitudes
+    min_level = np.exp(MIN_LEVEL_DB / 20 * np.log(10))
+    db = 20 * np.log10(np.maximum(min_level, mel)) - REF_LEVEL_DB
+    normalized = (2 * MAX_ABS_VALUE) * ((db - MIN_LEVEL_DB) / -MIN_LEVEL_DB) - MAX_ABS_VALUE
+    return np.clip(normalized, -MAX_ABS_VALUE, MAX_ABS_VALUE).astype(np.float32)
+
+
+def _stft_magnitudes_numpy(y):
+    padded = np.pad(y, N_FFT // 2, mode="reflect")
+    frames = sliding_window_view(padded, N_FFT)[::HOP_SIZE]
+    window = _hann(WIN_SIZE)
+    return np.abs(np.fft.rfft(frames * window, axis=1)).T.astype(np.float32)
+
+
+def _stft_magnitudes_torch(y):
+    import torch
+
+    spectrum = torch.stft(
+        torch.from_numpy(y), n_fft=N_FFT, hop_length=HOP_SIZE, win_length=WIN_SIZE,
+        window=torch.hann_window(WIN_SIZE, periodic=True), center=True, pad_mode="reflect",
+        return_complex=True,
+    )
+    return spectrum.abs().numpy()
+
+
+def _hann(size):
+    # Periodic Hann, as librosa uses for STFT windows
+    return (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(size) / size)).astype(np.float32)
+
+
+def window_starts(num_frames, fps, step):
+    """Start frame of each mel window, matching Wav2Lip's `int(i * 80 / fps)` loop."""
+    multiplier = 80. / fps
+    starts = (np.arange(int((num_frames - step) / multiplier) + 2) * multiplier).astype(int)
+    return starts[starts + step <= num_frames]
+
+
+def mel_windows(mel, fps=25, step=16):
+    """
+    Stacks every mel window Wav2Lip consumes into one batch.
+
+    Args:
+        mel (np.ndarray): (80, frames) mel spectrogram.
+        fps (int): Video frame rate.
+        step (int): Mel frames per window.
+
+    Returns:
+        np.ndarray: (windows, 1, 80, step) float32 batch, one window per video frame.
+    """
+    if mel.shape[1] < step:
+        return np.empty((0, 1, mel.shape[0], step), dtype=np.float32)
+    starts = window_starts(mel.shape[1], fps, step)
+    windows = sliding_window_view(mel, step, axis=1)[:, starts]  # (80, windows, step)
+    return np.ascontiguousarray(windows.transpose(1, 0, 2)[:, None], dtype=np.float32)
+
+
+class MelFrontend:
+    """
+    Mel front-end for Wav2Lip with an in-memory LRU of results keyed by audio content hash,
+    so replayed or repeated phrases skip the STFT entirely.
+    """
+
+    def __init__(self, fps=25, step=16, backend=MEL_BACKEND, cache_entries=MEL_CACHE_ENTRIES):
+        self.fps = fps
+        self.step = step
+        self.backend = backend
+        self.cache_entries = cache_entries
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+
+    def windows(self, wav):
+        """Returns the (windows, 1, 80, step) mel batch for mono 16 kHz samples."""
+        wav = np.ascontiguousarray(wav, dtype=np.float32)
+        key = hashlib.blake2b(wav.tobytes(), digest_size=16).digest()
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                return self.cache[key]
+
+        batch = mel_windows(melspectrogram(wav, self.backend), self.fps, self.step)
+        # Cached batches are shared between callers
+        batch.flags.writeable = False
+        with self.lock:
+            self.cache[key] = batch
+            while len(self.cache) > self.cache_entries:
+                self.cache.popitem(last=False)
+        return batch
@@ -0,0 +1,83 @@
+import time
+import logging
+import importlib
+import threading
+
+logger = logging.getLogger("ModelRegistry")
+
+
+class ModelRegistry:
+    """
+    Loads heavy engines in background threads.
+    Each engine is named by the module and factory that build it, so the module
+    (and its torch/transformers imports) is only imported when loading starts.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def register(self, name, module_path, factory_name):
+        """Declares an engine built by calling `module_path.factory_name()`."""
+        self.entries[name] = {
+            "module": module_path,
+            "factory": factory_name,
+            "state": "pending",
+            "import_s": None,
+            "init_s": None,
+            "instance": None,
+            "error": None,
+            "thread": None,
+            "done": threading.Event(),
+        }
+
+    def start(self, *names):
+        """Starts loading the named engines (all if none given) in background threads."""
+        for name in names or list(self.entries):
+            entry = self.entries[name]
+            with self.lock:
+                if entry["thread"] is not None:
+                    continue
+                entry["state"] = "loading"
+                entry["thread"] = threading.Thread(target=self._load, args=(name,), daemon=True)
+            entry["thread"].start()
+
+    def get(self, name, timeout=None):
+        """Returns the engine, starting and waiting for its load if needed."""
+        entry = self.entries[name]
+        self.start(name)
+        if not entry["done"].wait(timeout):
+            raise TimeoutError(f"{name} is still loading")
+        if entry["error"] is not None:
+            raise entry["error"]
+        return entry["instance"]
+
+    def is_ready(self, name):
+        return self.entries[name]["state"] == "ready"
+
+    def status(self):
+        """Returns state and import/init timings for every engine."""
+        return {
+            name: {key: entry[key] for key in ("state", "import_s", "init_s")}
+            for name, entry in self.entries.items()
+        }
+
+    def _load(self, name):
+        entry = self.entries[name]
+        try:
+            start = time.perf_counter()
+            module = importlib.import_module(entry["module"])
+            entry["import_s"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            entry["instance"] = getattr(module, entry["factory"])()
+            entry["init_s"] = time.perf_counter() - start
+
+            entry["state"] = "ready"
+            logger.info(f"{name} ready (import {entry['import_s']:.1f}s, init {entry['init_s']:.1f}s).")
+        except Exception as e:
+            entry["error"] = e
+            entry["state"] = "failed"
+            logger.error(f"{name} failed to load: {e}")
+        finally:
+            entry["done"].set()
@@ -0,0 +1,98 @@
+import os
+import logging
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from src.config import EMBEDDING_MODEL_ID, EMBEDDING_ONNX_QUANTIZE, EMBED_BATCH_SIZE, ONNX_MODEL_DIR
+
+logger = logging.getLogger("OnnxEmbeddings")
+
+MAX_SEQ_LENGTH = 256  # Matches the sentence-transformers setting for all-MiniLM-L6-v2
+
+
+class OnnxEmbeddings(Embeddings):
+    """
+    Sentence-transformers embeddings run on ONNX Runtime's CPU execution provider.
+    The transformer is exported to ONNX once (optionally int8-quantized) and cached on disk.
+    Mean pooling and L2 normalisation match the PyTorch pipeline, so vectors are interchangeable.
+    """
+
+    def __init__(self, model_id=EMBEDDING_MODEL_ID, quantize=EMBEDDING_ONNX_QUANTIZE,
+                 batch_size=EMBED_BATCH_SIZE, model_dir=ONNX_MODEL_DIR):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self.model_id = model_id
+        self.batch_size = batch_size
+        self.tokenizer = AutoTokenizer.from_pretrained(model_id)
+
+        model_path = self._export(model_id, os.path.join(model_dir, model_id.replace("/", "__")), quantize)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        logger.info(f"Loaded ONNX embeddings from {model_path}.")
+
+    def embed_documents(self, texts):
+        """Embeds texts in length-sorted batches so each batch pads to similar lengths."""
+        if not texts:
+            return []
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors = np.empty((len(texts), 0), dtype=np.float32)
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            embedded = self._embed([texts[i] for i in batch])
+            if not vectors.shape[1]:
+                vectors = np.empty((len(texts), embedded.shape[1]), dtype=np.float32)
+            vectors[batch] = embedded
+        return vectors.tolist()
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+    def _embed(self, texts):
+        encoded = self.tokenizer(texts, padding=True, truncation=True, max_length=MAX_SEQ_LENGTH, return_tensors="np")
+        inputs = {name: encoded[name].astype(np.int64) for name in self.input_names}
+        hidden = self.session.run(None, inputs)[0]
+
+        mask = encoded["attention_mask"][..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        return pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+
+    @staticmethod
+    def _export(model_id, export_dir, quantize):
+        """Exports the transformer to ONNX (and an int8 copy) unless already on disk."""
+        fp32_path = os.path.join(export_dir, "model.onnx")
+        int8_path = os.path.join(export_dir, "model.int8.onnx")
+
+        if not os.path.exists(fp32_path):
+            import torch
+            from transformers import AutoModel, AutoTokenizer
+
+            logger.info(f"Exporting {model_id} to ONNX...")
+            os.makedirs(export_dir, exist_ok=True)
+            model = AutoModel.from_pretrained(model_id).eval()
+            dummy = AutoTokenizer.from_pretrained(model_id)(["export"], return_tensors="pt")
+            names = ["input_ids", "attention_mask", "token_type_ids"]
+            tmp_path = f"{fp32_path}.tmp"
+            torch.onnx.export(
+                model,
+                tuple(dummy[name] for name in names),
+                tmp_path,
+                input_names=names,
+                output_names=["last_hidden_state"],
+                dynamic_axes={name: {0: "batch", 1: "sequence"} for name in names + ["last_hidden_state"]},
+                opset_version=14,
+            )
+            os.replace(tmp_path, fp32_path)
+
+        if not quantize:
+            return fp32_path
+
+        if not os.path.exists(int8_path):
+            from onnxruntime.quantization import quantize_dynamic, QuantType
+
+            logger.info("Quantizing ONNX embeddings to int8...")
+            tmp_path = os.path.join(export_dir, "model.int8.tmp.onnx")
+            quantize_dynamic(fp32_path, tmp_path, weight_type=QuantType.QInt8)
+            os.replace(tmp_path, int8_path)
+        return int8_path
@@ -0,0 +1,83 @@
+import os
+import json
+import uuid
+import logging
+from src.config import PAGE_CACHE_DIR, PAGE_CACHE_MAX_BYTES
+from src.utils import touch, evict_lru
+
+logger = logging.getLogger("PageCache")
+
+META_FILE = "meta.json"
+
+
+class PageCache:
+    """
+    On-disk store of extracted page text keyed by PDF content hash and page number.
+    Each document is a directory with one text file per page, so partially parsed
+    documents resume where they stopped and narration and RAG ingestion share results.
+    """
+
+    def __init__(self, cache_dir=PAGE_CACHE_DIR, max_bytes=PAGE_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def page_count(self, key):
+        """Returns the recorded page count for a document, or None if it is unknown."""
+        try:
+            with open(os.path.join(self._entry_dir(key), META_FILE)) as f:
+                count = json.load(f)["page_count"]
+        except (OSError, ValueError, KeyError):
+            return None
+        touch(self._entry_dir(key))
+        return count
+
+    def set_page_count(self, key, page_count):
+        """Registers a document, evicting old documents over the size budget."""
+        entry_dir = self._entry_dir(key)
+        os.makedirs(entry_dir, exist_ok=True)
+        self._write(os.path.join(entry_dir, META_FILE), json.dumps({"page_count": page_count}))
+        self._evict()
+
+    def has(self, key, page_index):
+        return os.path.exists(self._page_path(key, page_index))
+
+    def get(self, key, page_index):
+        """Returns the cached text of a page, or None on a miss."""
+        try:
+            with open(self._page_path(key, page_index), encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def put_many(self, key, pages):
+        """Stores (page_index, text) pairs for a document."""
+        entry_dir = self._entry_dir(key)
+        if not os.path.isdir(entry_dir):
+            return
+        for page_index, text in pages:
+            self._write(self._page_path(key, page_index), text)
+
+    def _entry_dir(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def _page_path(self, key, page_index):
+        return os.path.join(self.cache_dir, key, f"{page_index}.txt")
+
+    @staticmethod
+    def _write(path, content):
+        tmp_path = f"{path}.tmp-{uuid.uuid4().hex}"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write page cache file {path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _evict(self):
+        """Removes least recently used documents until the cache fits in `max_bytes`."""
+        documents = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)]
+        for path in evict_lru([path for path in documents if os.path.isdir(path)], self.max_bytes):
+            logger.info(f"Evicted cached pages of {os.path.basename(path)[:12]}.")
@@ -1,41 +1,81 @@
 import pdfplumber
 import re
+import os
 import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from src.config import PDF_WORKERS, PDF_PAGES_PER_TASK
+from src.chapter_index import ChapterIndex
+from src.page_cache import PageCache
+from src.utils import file_sha256
 
 logger = logging.getLogger("PDFExtractor")
 
-def extract_text_from_pdf(pdf_path: str, chapter_number: int = None) -> str:
+_HYPHEN_BREAK = re.compile(r'-\n')
+_LINE_BREAK = re.compile(r'\n\n|\n')
+_SPACES = re.compile(r' +')
+# Marks where each page starts while the joined pages are cleaned; never occurs in page text
+_PAGE_MARK = '\x00'
+_MARK_BEFORE_SPACE = re.compile(r'(\x00+)(\s+)')
+
+_page_cache = None
+
+def extract_text_from_pdf(pdf_path: str, chapter_number: int = None, workers: int = PDF_WORKERS) -> str:
     """
     Extracts text from a PDF file, optionally filtering by chapter number.
     
     Args:
         pdf_path (str): Path to the PDF file.
         chapter_number (int, optional): The chapter number to extract.
+        workers (int, optional): Page extraction processes. Defaults to the CPU count.
 
     Returns:
         str: The extracted text, or None if extraction failed.
     """
-    full_text = _read_pdf_content(pdf_path)
+    if chapter_number is not None:
+        return _extract_chapter(pdf_path, chapter_number, workers)
+
+    full_text = _read_pdf_content(pdf_path, workers)
     if not full_text:
         return None
 
-    cleaned_text = _clean_text(full_text)
+    return _clean_text(full_text)
+
+def get_chapter_index(pdf_path: str, workers: int = PDF_WORKERS) -> ChapterIndex:
+    """
+    Returns the chapter index for a PDF, loading its sidecar or building it in one pass.
 
-    if chapter_number is None:
-        return cleaned_text
+    Args:
+        pdf_path (str): Path to the PDF file.
+        workers (int, optional): Page extraction processes. Defaults to the CPU count.
 
-    return _extract_chapter(cleaned_text, chapter_number)
+    Returns:
+        ChapterIndex: Cleaned text and chapter boundaries, or None if extraction failed.
+    """
+    key = file_sha256(pdf_path)
+    index = ChapterIndex.load(key)
+    if index is not None:
+        logger.info(f"Loaded chapter index with {len(index.headings)} chapters.")
+        return index
+
+    try:
+        index = ChapterIndex.build(_iter_clean_pages(iter_page_texts(pdf_path, workers)))
+    except Exception as e:
+        logger.error(f"Error reading PDF: {e}")
+        return None
+    if not index.text:
+        return None
+    index.save(key)
+    logger.info(f"Indexed {len(index.headings)} chapters.")
+    return index
 
-def _read_pdf_content(pdf_path: str) -> str:
-    """Reads raw text content from the PDF."""
+def _read_pdf_content(pdf_path: str, workers: int = PDF_WORKERS) -> str:
+    """Reads raw text content from the PDF, extracting page ranges in parallel."""
     text_content = []
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            logger.info(f"Opened PDF with {len(pdf.pages)} pages.")
-            for page in pdf.pages:
-                text = page.extract_text()
-                if text:
-                    text_content.append(text)
+        for _, text in iter_page_texts(pdf_path, workers):
+            if text:
+                text_content.append(text)
         return "\n".join(text_content)
     except Exception as e:
         logger.error(f"Error reading PDF: {e}")
@@ -44,54 +84,236 @@ def _read_pdf_content(pdf_path: str) -> str:
 def _clean_text(text: str) -> str:
     """Cleans the extracted text by removing hyphenation and normalizing spaces."""
     # Remove hyphenation at end of lines (e.g. "exam-\nple" -> "example")
-    text = re.sub(r'-\n', '', text)
+    text = _HYPHEN_BREAK.sub('', text)
     
-    # Normalize newlines: 
-    # Replace single newlines with space (unwrapping hard wrapped text)
+    # Normalize newlines in one pass:
     # Keep double newlines as paragraph breaks.
-    text = text.replace('\n\n', '||PARAGRAPH||')
-    text = text.replace('\n', ' ')
-    text = text.replace('||PARAGRAPH||', '\n')
+    # Replace single newlines with space (unwrapping hard wrapped text)
+    text = _LINE_BREAK.sub(lambda m: '\n' if len(m.group()) == 2 else ' ', text)
     
     # Remove excessive spaces
-    text = re.sub(r' +', ' ', text)
+    text = _SPACES.sub(' ', text)
     return text.strip()
 
-def _extract_chapter(text: str, chapter_number: int) -> str:
-    """Extracts a specific chapter from the full text using heuristics."""
+def iter_paragraphs(pdf_path: str, workers: int = PDF_WORKERS):
+    """
+    Yields cleaned paragraphs as pages are parsed, instead of returning the whole book.
+    Hyphenation across page boundaries is joined. A paragraph still open at the end of a page
+    is released up to that page's last line break, so memory scales with a page even when the
+    text has no blank lines; joined with spaces, its pieces match the paragraph in
+    `extract_text_from_pdf(pdf_path)`.
+
+    Args:
+        pdf_path (str): Path to the PDF file.
+        workers (int, optional): Page extraction processes. Defaults to the CPU count.
+
+    Yields:
+        str: One cleaned paragraph (or page-sized piece of one) at a time.
+    """
+    for _, paragraph in _iter_page_paragraphs(iter_page_texts(pdf_path, workers)):
+        yield paragraph
+
+def _iter_page_paragraphs(page_texts):
+    """Yields (page_index, paragraph) pairs from (page_index, text) pairs, where page_index is the page the paragraph starts on."""
+    carry, carry_page = "", 0
+    for page_index, text in page_texts:
+        if not text:
+            continue
+        if carry:
+            carry = f"{carry}\n{text}"
+        else:
+            carry, carry_page = text, page_index
+
+        # Everything before the last line break is final: a single break only becomes a space,
+        # and the rest may continue (or be hyphenated) onto the next page
+        cut = _last_line_break(carry)
+        if cut == -1:
+            continue
+        block, carry = carry[:cut], carry[cut + 1:]
+        for i, paragraph in enumerate(_split_paragraphs(block)):
+            yield (carry_page if i == 0 else page_index), paragraph
+        carry_page = page_index
+
+    for paragraph in _split_paragraphs(carry):
+        yield carry_page, paragraph
+
+def _last_line_break(text: str) -> int:
+    """Index of the last newline that neither ends a hyphenated word nor sits inside a paragraph break, or -1."""
+    idx = text.rfind('\n')
+    while idx > 0 and text[idx - 1] in '-\n':
+        idx = text.rfind('\n', 0, idx)
+    return idx
+
+def _iter_clean_pages(page_texts):
+    """
+    Cleans (page_index, text) pairs as one text, one paragraph per line, and yields
+    (page_index, piece) pairs whose concatenation is that text, each piece starting at the
+    first character of its page, even when the page begins mid-paragraph.
+    """
+    parts, pages = [], []
+    for page_index, text in page_texts:
+        if not text:
+            continue
+        text = text.replace(_PAGE_MARK, '')
+        if text.strip():
+            text = _PAGE_MARK + text
+            pages.append(page_index)
+        parts.append(text)
+
+    # The steps of _clean_text, with each mark moved onto the first character that survives
+    # hyphen removal, so marks never split a line break or a run of spaces
+    text = _HYPHEN_BREAK.sub('', '\n'.join(parts))
+    moved = 1
+    while moved:
+        text, moved = _MARK_BEFORE_SPACE.subn(r'\2\1', text)
+    text = _LINE_BREAK.sub(lambda m: '\n' if len(m.group()) == 2 else ' ', text)
+    text = _SPACES.sub(' ', text)
+
+    paragraphs, starts, length = [], [], 0
+    for paragraph in text.split('\n'):
+        paragraph = paragraph.strip()
+        # Marks of pages that start after this paragraph's last character trail it; strip before them
+        body = paragraph.rstrip(_PAGE_MARK)
+        paragraph = body.rstrip() + paragraph[len(body):]
+        if paragraph.strip(_PAGE_MARK) == '':
+            # A page whose text was all removed starts with the next paragraph
+            starts += [length + (1 if paragraphs else 0)] * len(paragraph)
+            continue
+        if paragraphs:
+            length += 1  # The newline joining paragraphs
+        for i, piece in enumerate(paragraph.split(_PAGE_MARK)):
+            if i:
+                starts.append(length)
+            length += len(piece)
+        paragraphs.append(paragraph.replace(_PAGE_MARK, ''))
+
+    text = '\n'.join(paragraphs)
+    starts = [min(start, len(text)) for start in starts]
+    if starts:
+        starts[0] = 0
+    for page_index, start, end in zip(pages, starts, starts[1:] + [len(text)]):
+        yield page_index, text[start:end]
+
+def _split_paragraphs(text: str) -> list:
+    return [paragraph.strip() for paragraph in _clean_text(text).split('\n') if paragraph.strip()]
+
+def _extract_chapter(pdf_path: str, chapter_number: int, workers: int = PDF_WORKERS) -> str:
+    """Slices a specific chapter out of the PDF's chapter index."""
     logger.info(f"Attempting to extract Chapter {chapter_number}...")
-    
-    # Patterns to find Chapter headers
-    chapter_patterns = [
-        f"Chapter {chapter_number}", f"CHAPTER {chapter_number}",
-        f"Adhyay {chapter_number}", f"ADHYAY {chapter_number}"
-    ]
-    
-    start_index = _find_pattern_index(text, chapter_patterns)
-    
-    if start_index == -1:
+    index = get_chapter_index(pdf_path, workers)
+    if index is None:
+        return None
+
+    chapter = index.chapter(chapter_number)
+    if chapter is None:
         logger.warning(f"Could not find start of Chapter {chapter_number}. Returning full text.")
-        return text
-
-    # Find end of chapter (start of next chapter)
-    next_chapter_num = chapter_number + 1
-    next_chapter_patterns = [
-        f"Chapter {next_chapter_num}", f"CHAPTER {next_chapter_num}",
-        f"Adhyay {next_chapter_num}", f"ADHYAY {next_chapter_num}"
-    ]
-    
-    end_index = _find_pattern_index(text, next_chapter_patterns, start_index + 100)
-    
-    if end_index != -1:
-        logger.info(f"Extracted Chapter {chapter_number} successfully.")
-        return text[start_index:end_index].strip()
-    
-    return text[start_index:].strip()
-
-def _find_pattern_index(text: str, patterns: list, start_search_from: int = 0) -> int:
-    """Helper to find the first occurrence of any pattern in the list."""
-    for pattern in patterns:
-        idx = text.find(pattern, start_search_from)
-        if idx != -1:
-            return idx
-    return -1
+        return index.text
+
+    start, end = index.bounds(chapter_number)
+    logger.info(f"Extracted Chapter {chapter_number} successfully "
+                f"(pages {index.page_of(start) + 1}-{index.page_of(max(start, end - 1)) + 1}).")
+    return chapter
+
+def iter_page_texts(pdf_path: str, workers: int = PDF_WORKERS, pages_per_task: int = PDF_PAGES_PER_TASK,
+                    use_cache: bool = True):
+    """
+    Yields the raw text of each page in order, parsing page ranges in a process pool.
+    At most two ranges per worker are in flight, so memory stays bounded on huge files.
+    Pages are cached on disk by file hash, so each page of a document is parsed at most once
+    across narration, RAG ingestion and restarts.
+
+    Args:
+        pdf_path (str): Path to the PDF file.
+        workers (int, optional): Worker processes. Defaults to the CPU count.
+        pages_per_task (int): Pages parsed per task.
+        use_cache (bool): Read and fill the page cache. Off, every page is parsed (e.g. for benchmarks).
+
+    Yields:
+        tuple: (page_index, text) with a zero-based page index.
+    """
+    if use_cache:
+        cache = get_page_cache()
+        key = file_sha256(pdf_path)
+        page_count = cache.page_count(key)
+        if page_count is None:
+            page_count = get_page_count(pdf_path)
+            cache.set_page_count(key, page_count)
+    else:
+        cache = key = None
+        page_count = get_page_count(pdf_path)
+    logger.info(f"Opened PDF with {page_count} pages.")
+
+    ranges = [(start, min(start + pages_per_task, page_count))
+              for start in range(0, page_count, pages_per_task)]
+    if use_cache:
+        missing = {(start, end) for start, end in ranges
+                   if not all(cache.has(key, i) for i in range(start, end))}
+    else:
+        missing = set(ranges)
+    if missing:
+        logger.info(f"Parsing {len(missing)} of {len(ranges)} page ranges ({len(ranges) - len(missing)} cached).")
+
+    def store(pages):
+        if use_cache:
+            cache.put_many(key, pages)
+
+    def read_cached(start, end):
+        pages = [(i, cache.get(key, i)) for i in range(start, end)]
+        if any(text is None for _, text in pages):
+            # A file vanished between the check and the read; parse the range again
+            pages = _extract_page_range(pdf_path, start, end)
+            store(pages)
+        return pages
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(missing) <= 1:
+        for start, end in ranges:
+            if (start, end) in missing:
+                pages = _extract_page_range(pdf_path, start, end)
+                store(pages)
+                yield from pages
+            else:
+                yield from read_cached(start, end)
+        return
+
+    # Spawn, not fork: the app process already runs model-loading and torch/OpenMP threads,
+    # and forking a threaded process can deadlock the child
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        pending = []
+        next_range = 0
+        while next_range < len(ranges) or pending:
+            while next_range < len(ranges) and len(pending) < workers * 2:
+                start, end = ranges[next_range]
+                future = pool.submit(_extract_page_range, pdf_path, start, end) if (start, end) in missing else None
+                pending.append((start, end, future))
+                next_range += 1
+            start, end, future = pending.pop(0)
+            if future is None:
+                yield from read_cached(start, end)
+            else:
+                pages = future.result()
+                store(pages)
+                yield from pages
+
+def get_page_cache() -> PageCache:
+    """Returns the process-wide page text cache."""
+    global _page_cache
+    if _page_cache is None:
+        _page_cache = PageCache()
+    return _page_cache
+
+def get_page_count(pdf_path: str) -> int:
+    """Returns the number of pages in the PDF."""
+    with pdfplumber.open(pdf_path) as pdf:
+        return len(pdf.pages)
+
+def _extract_page_range(pdf_path: str, start: int, end: int) -> list:
+    """Extracts the text of pages [start, end) in a worker process."""
+    texts = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for i in range(start, end):
+            page = pdf.pages[i]
+            texts.append((i, page.extract_text() or ""))
+            # Drop the page's cached layout objects so long ranges don't accumulate them
+            page.close()
+    return texts
@@ -1,83 +1,449 @@
 import os
+import time
 import logging
-from langchain_community.document_loaders import PDFPlumberLoader, PyPDFLoader
+from threading import Thread, Lock
+from langchain_community.document_loaders import PyPDFLoader
+from langchain_core.documents import Document
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_community.vectorstores import FAISS
-from langchain_community.llms import HuggingFacePipeline
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM, pipeline
+from transformers import AutoTokenizer, AutoModelForSeq2SeqLM, TextIteratorStreamer
 import torch
+from src.config import (
+    EMBEDDING_MODEL_ID, EMBEDDING_BACKEND, EMBEDDING_ONNX_QUANTIZE,
+    LLM_MODEL_ID, LLM_DRAFT_MODEL_ID, LLM_PRECISION, LLM_MAX_INPUT_TOKENS, RAG_BATCH_SIZE,
+    CHUNK_SIZE, CHUNK_OVERLAP, INGEST_STREAMING, ANN_COMPRESSION, HYBRID_RETRIEVAL,
+)
+from src.index_cache import IndexCache
+from src.ingest_pipeline import stream_ingest
+from src.pdf_extractor import iter_page_texts
+from src.knowledge_base import KnowledgeBase
+from src.answer_cache import AnswerCache
+from src.ann_index import optimize_vector_store
+from src.context_packer import pack_context
+from src.lexical_index import BM25Index
+from src.embedding_cache import EmbeddingCache, CachedEmbeddings
 
 logger = logging.getLogger("RAGEngine")
 
+GENERATION_KWARGS = {
+    "max_length": 512,
+    "temperature": 0.3,
+    "top_p": 0.95,
+    "repetition_penalty": 1.15,
+}
+
+PRECISIONS = ("fp32", "int8", "bf16")
+
+# fp32 ONNX matches the PyTorch embeddings, so both share caches; int8 vectors are kept apart
+EMBEDDING_SIGNATURE = EMBEDDING_MODEL_ID + ("-onnx-int8" if EMBEDDING_BACKEND == "onnx" and EMBEDDING_ONNX_QUANTIZE else "")
+
+
+def load_embeddings(backend=EMBEDDING_BACKEND):
+    """Returns the LangChain embeddings for the configured backend ("torch" or "onnx")."""
+    if backend == "onnx":
+        from src.onnx_embeddings import OnnxEmbeddings
+        return OnnxEmbeddings(EMBEDDING_MODEL_ID)
+    return HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_ID)
+
+
+def load_llm(model_id=LLM_MODEL_ID, precision=LLM_PRECISION):
+    """
+    Loads the seq2seq LLM and its tokenizer at the requested CPU precision.
+
+    Args:
+        model_id (str): Hugging Face model id.
+        precision (str): "fp32", "int8" (dynamic int8 quantization of Linear layers)
+            or "bf16" (falls back to fp32 when the CPU lacks native bf16 support).
+
+    Returns:
+        tuple: (tokenizer, model)
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision '{precision}', expected one of {PRECISIONS}")
+
+    tokenizer = AutoTokenizer.from_pretrained(model_id)
+    if precision == "bf16" and not _cpu_supports_bf16():
+        logger.warning("CPU has no native bf16 support. Loading the LLM in fp32 instead.")
+        precision = "fp32"
+
+    dtype = torch.bfloat16 if precision == "bf16" else torch.float32
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_id, torch_dtype=dtype)
+    model.eval()
+
+    if precision == "int8":
+        # fbgemm is x86-only; ARM CPUs (e.g. Apple Silicon) use qnnpack
+        if "fbgemm" not in torch.backends.quantized.supported_engines:
+            torch.backends.quantized.engine = "qnnpack"
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    logger.info(f"Loaded {model_id} in {precision}.")
+    return tokenizer, model
+
+
+def _cpu_supports_bf16():
+    try:
+        return bool(torch.ops.mkldnn._is_mkldnn_bf16_supported())
+    except (AttributeError, RuntimeError):
+        return False
+
+
+def generate_with_stats(model, inputs, draft_model=None, streamer=None):
+    """
+    Runs greedy generation, optionally with a draft model proposing tokens for `model` to verify
+    (transformers assisted generation). Under greedy decoding the output matches plain generation.
+
+    Args:
+        model: The seq2seq model whose output is returned.
+        inputs: Tokenized prompt (a single sequence when a draft model is used).
+        draft_model (optional): Small seq2seq model sharing the tokenizer.
+        streamer (optional): Transformers streamer fed as tokens are accepted.
+
+    Returns:
+        tuple: (output_ids, stats) where stats holds "new_tokens", "target_passes" and, with a
+            draft model, "draft_passes", "acceptance_rate" and "speedup_est" (tokens per target pass).
+    """
+    passes = {"target": 0, "draft": 0}
+    hooks = [model.register_forward_hook(lambda *_: passes.__setitem__("target", passes["target"] + 1))]
+    kwargs = dict(GENERATION_KWARGS)
+    if draft_model is not None:
+        kwargs["assistant_model"] = draft_model
+        hooks.append(draft_model.register_forward_hook(lambda *_: passes.__setitem__("draft", passes["draft"] + 1)))
+
+    try:
+        with torch.no_grad():
+            output = model.generate(**inputs, streamer=streamer, **kwargs)
+    finally:
+        for hook in hooks:
+            hook.remove()
+
+    # The first decoder position is the start token, not a generated one
+    new_tokens = output.shape[-1] - 1
+    stats = {"new_tokens": new_tokens, "target_passes": passes["target"]}
+    if draft_model is not None:
+        # Each verification pass contributes one token of its own on top of the accepted draft tokens
+        accepted = max(0, new_tokens - passes["target"])
+        stats.update({
+            "draft_passes": passes["draft"],
+            "acceptance_rate": accepted / passes["draft"] if passes["draft"] else 0.0,
+            "speedup_est": new_tokens / passes["target"] if passes["target"] else 1.0,
+        })
+    return output, stats
+
 class RAGEngine:
-    def __init__(self):
-        self.vector_store = None
-        self.llm = None
+    def __init__(self, precision=LLM_PRECISION):
+        self.precision = precision
+        self.model = None
+        self.draft_model = None
+        self.tokenizer = None
         self.embeddings = None
+        self.last_answer_stats = {}
+        self.index_cache = IndexCache()
         self._initialize_models()
+        self.knowledge_base = KnowledgeBase(self.embeddings)
+        # The engine is shared by every session: a shard stays until the last session using it lets go
+        self._document_refs = {}
+        self._documents_lock = Lock()
+        self.answer_cache = AnswerCache()
 
     def _initialize_models(self):
-        logger.info("Loading Embedding Model...")
-        self.embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+        logger.info(f"Loading Embedding Model ({EMBEDDING_BACKEND})...")
+        self.embeddings = load_embeddings()
+        # Chunk embeddings go through a persistent cache so revised or overlapping PDFs only embed new text
+        self.embedding_cache = EmbeddingCache(namespace=EMBEDDING_SIGNATURE)
+        self.chunk_embeddings = CachedEmbeddings(self.embeddings, self.embedding_cache)
         
-        logger.info("Loading Local LLM (LaMini-T5-738M)...")
-        model_id = "MBZUAI/LaMini-T5-738M"
-        tokenizer = AutoTokenizer.from_pretrained(model_id)
-        model = AutoModelForSeq2SeqLM.from_pretrained(model_id, torch_dtype=torch.float32)
-        
-        pipe = pipeline(
-            "text2text-generation",
-            model=model,
-            tokenizer=tokenizer,
-            max_length=512,
-            temperature=0.3,
-            top_p=0.95,
-            repetition_penalty=1.15
-        )
-        self.llm = HuggingFacePipeline(pipeline=pipe)
+        logger.info(f"Loading Local LLM (LaMini-T5-738M, {self.precision})...")
+        self.tokenizer, self.model = load_llm(LLM_MODEL_ID, self.precision)
+
+        if LLM_DRAFT_MODEL_ID:
+            logger.info(f"Loading Draft LLM ({LLM_DRAFT_MODEL_ID}) for assisted decoding...")
+            _, self.draft_model = load_llm(LLM_DRAFT_MODEL_ID, self.precision)
         logger.info("Models Loaded Successfully.")
 
-    def ingest_pdf(self, pdf_path):
+    def ingest_pdf(self, pdf_path, progress_callback=None):
+        """
+        Adds a PDF to the knowledge base, building its index shard or loading it from cache.
+        Documents already in the knowledge base are not re-embedded. Each successful call holds
+        the document until a matching `remove_document` call.
+
+        Args:
+            pdf_path (str): Path to the PDF file.
+            progress_callback (callable, optional): Called as fn(pages_done, total_pages, chunks_done)
+                while streaming ingestion runs.
+
+        Returns:
+            str: The document id, or None if the PDF held no text.
+        """
         logger.info(f"Ingesting PDF: {pdf_path}")
+        cache_key = self.index_cache.key_for(
+            pdf_path,
+            chunk_size=CHUNK_SIZE,
+            chunk_overlap=CHUNK_OVERLAP,
+            embedding_model=EMBEDDING_SIGNATURE,
+            ann_compression=ANN_COMPRESSION,
+        )
+        source = os.path.basename(pdf_path)
+        with self._documents_lock:
+            if cache_key in self.knowledge_base:
+                logger.info("Document already in knowledge base.")
+                self._document_refs[cache_key] = self._document_refs.get(cache_key, 0) + 1
+                return cache_key
+
+        cached_store = self.index_cache.load(cache_key, self.embeddings)
+        if cached_store is not None:
+            lexical_index = self.index_cache.load_lexical(cache_key) or BM25Index.from_vector_store(cached_store)
+            self._add_document(cache_key, cached_store, source, lexical_index)
+            logger.info("Vector Store Loaded from Cache.")
+            return cache_key
+
+        text_splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+        vector_store = None
+        if INGEST_STREAMING:
+            try:
+                vector_store = stream_ingest(pdf_path, self.chunk_embeddings, text_splitter,
+                                             progress_callback=progress_callback)
+            except Exception as e:
+                logger.warning(f"Streaming ingestion failed: {e}. Falling back to loaders.")
+        if vector_store is None:
+            vector_store = self._load_and_embed(pdf_path, text_splitter)
+
+        if vector_store is None:
+            return None
+
+        lexical_index = BM25Index.from_vector_store(vector_store)
+        ann_report = optimize_vector_store(vector_store)
+        self.index_cache.save(cache_key, vector_store, search_params=ann_report["search_params"],
+                              lexical_index=lexical_index)
+        self._add_document(cache_key, vector_store, source, lexical_index)
+        stats = self.embedding_cache.stats()
+        logger.info(f"Vector Store Created. Embedding cache hit ratio {stats['hit_ratio']:.0%} "
+                    f"({stats['hits']} hits, {stats['misses']} misses).")
+        return cache_key
+
+    def remove_document(self, doc_id):
+        """
+        Releases one hold on a document taken by `ingest_pdf`. The shard leaves the knowledge base
+        only when no other session still uses it; its cached index is kept on disk.
+        Returns True if the shard was removed.
+        """
+        with self._documents_lock:
+            refs = self._document_refs.get(doc_id, 0) - 1
+            if refs > 0:
+                self._document_refs[doc_id] = refs
+                return False
+            self._document_refs.pop(doc_id, None)
+            return self.knowledge_base.remove_document(doc_id)
+
+    def _add_document(self, doc_id, vector_store, source, lexical_index):
+        with self._documents_lock:
+            self.knowledge_base.add_document(doc_id, vector_store, source, lexical_index)
+            self._document_refs[doc_id] = self._document_refs.get(doc_id, 0) + 1
+
+    def _load_and_embed(self, pdf_path, text_splitter):
+        """Loads the whole PDF from the shared page cache (or PyPDFLoader) and embeds it in one shot."""
         try:
-            loader = PDFPlumberLoader(pdf_path)
-            documents = loader.load()
+            documents = [
+                Document(page_content=text, metadata={"source": pdf_path, "page": page_index})
+                for page_index, text in iter_page_texts(pdf_path, workers=1)
+                if text.strip()
+            ]
         except Exception as e:
-            logger.warning(f"PDFPlumber failed: {e}. Trying PyPDFLoader.")
+            logger.warning(f"Page extraction failed: {e}. Trying PyPDFLoader.")
             loader = PyPDFLoader(pdf_path)
             documents = loader.load()
 
         if not documents:
-            return
+            return None
 
-        text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
         texts = text_splitter.split_documents(documents)
         
         if not texts:
-            return
+            return None
 
-        self.vector_store = FAISS.from_documents(texts, self.embeddings)
-        logger.info("Vector Store Created.")
+        return FAISS.from_documents(texts, self.chunk_embeddings)
 
     def answer_question(self, query, user_age=25):
-        """Generates an answer tuned to the user's age."""
-        if not self.vector_store:
+        """
+        Generates an answer tuned to the user's age.
+        Per-answer details (packed context tokens, and the draft acceptance rate and estimated
+        speedup when assisted decoding is on) are left in `last_answer_stats`.
+        """
+        if not self.knowledge_base:
             return "Please upload a PDF first."
-            
-        # Tune prompt style based on age
+
+        cached, prompt, cache_args = self._prepare_answer(query, user_age)
+        if cached is not None:
+            return cached
+
+        answer = self._generate(prompt)
+        self.answer_cache.store(*cache_args, answer)
+        return answer
+
+    def answer_question_stream(self, query, user_age=25):
+        """
+        Streams the answer as it is generated, so speech can start on the first sentence.
+
+        Args:
+            query (str): The user's question.
+            user_age (int): Age used to tune the answer style.
+
+        Yields:
+            str: Successive pieces of the answer text.
+        """
+        if not self.knowledge_base:
+            yield "Please upload a PDF first."
+            return
+
+        cached, prompt, cache_args = self._prepare_answer(query, user_age)
+        if cached is not None:
+            yield cached
+            return
+
+        streamer = TextIteratorStreamer(self.tokenizer, skip_special_tokens=True)
+        errors = []
+
+        def generate():
+            try:
+                self._generate(prompt, streamer)
+            except Exception as e:
+                errors.append(e)
+                # generate() only ends the stream on success; without this the consumer would wait forever
+                streamer.end()
+
+        worker = Thread(target=generate)
+        worker.start()
+
+        pieces = []
+        for piece in streamer:
+            pieces.append(piece)
+            yield piece
+        worker.join()
+        if errors:
+            raise errors[0]
+
+        self.answer_cache.store(*cache_args, "".join(pieces).strip())
+
+    def _generate(self, prompt, streamer=None):
+        """Generates the answer for a packed prompt and records its decoding stats in `last_answer_stats`."""
+        inputs = self.tokenizer(prompt, truncation=True, max_length=LLM_MAX_INPUT_TOKENS, return_tensors="pt")
+        start = time.perf_counter()
+        output, stats = generate_with_stats(self.model, inputs, self.draft_model, streamer)
+        stats["generation_s"] = time.perf_counter() - start
+        self.last_answer_stats.update(stats)
+        if self.draft_model is not None:
+            logger.info(f"Assisted decoding: {stats['acceptance_rate']:.0%} of draft tokens accepted, "
+                        f"~{stats['speedup_est']:.2f}x fewer target passes.")
+        return self.tokenizer.decode(output[0], skip_special_tokens=True).strip()
+
+    def _prepare_answer(self, query, user_age):
+        """
+        Checks the answer cache and builds the prompt for a query.
+
+        Returns:
+            tuple: (cached_answer or None, prompt, cache_args) where cache_args are passed
+                to `answer_cache.store` along with the generated answer.
+        """
         age = int(user_age)
-        if age < 12:
-            style = "Explain it simply like I am a 10-year-old child. Use easy words and short sentences."
-        elif age < 18:
-            style = "Explain it clearly for a teenager. Be engaging but not too complex."
+        style_key, style = self._style_for_age(age)
+
+        query_vector = self.embeddings.embed_query(query)
+        cache_args = (query_vector, self.knowledge_base.version, style_key)
+        cached = self.answer_cache.lookup(*cache_args)
+        if cached is not None:
+            logger.info("Answer served from cache.")
+            self.last_answer_stats = {"cached": True}
+            return cached, None, cache_args
+
+        if HYBRID_RETRIEVAL:
+            docs = self.knowledge_base.hybrid_search(query, k=5, query_vector=query_vector)
         else:
-            style = "Explain it professionally and in detail for an adult."
+            docs = self.knowledge_base.search_by_vector(query_vector, k=5)
+        prompt, context_tokens = self._build_prompt(query, age, style, docs)
+        self.last_answer_stats = {"cached": False, "context_tokens": context_tokens}
+        return None, prompt, cache_args
 
-        docs = self.vector_store.similarity_search(query, k=5)
-        context = "\n".join([doc.page_content for doc in docs])
-        
-        prompt = f"""
+    def answer_questions(self, queries, user_age=25, batch_size=RAG_BATCH_SIZE):
+        """
+        Answers many questions with batched embedding, retrieval and generation.
+
+        Args:
+            queries (list): The questions to answer.
+            user_age (int): Age used to tune the answer style.
+            batch_size (int): Prompts decoded together per generate() call.
+
+        Returns:
+            list: One dict per query with "query", "answer", "cached", "context_tokens" and
+                "timings" (seconds per stage, amortised over the batch that served the query).
+        """
+        if not queries:
+            return []
+        if not self.knowledge_base:
+            return [{"query": q, "answer": "Please upload a PDF first.", "cached": False, "timings": {}} for q in queries]
+
+        age = int(user_age)
+        style_key, style = self._style_for_age(age)
+        version = self.knowledge_base.version
+
+        start = time.perf_counter()
+        query_vectors = self.embeddings.embed_documents(list(queries))
+        embed_time = (time.perf_counter() - start) / len(queries)
+
+        results = []
+        pending = []
+        for query, query_vector in zip(queries, query_vectors):
+            cached = self.answer_cache.lookup(query_vector, version, style_key)
+            result = {"query": query, "answer": cached, "cached": cached is not None,
+                      "timings": {"embed_s": embed_time}}
+            results.append(result)
+            if cached is None:
+                pending.append((result, query_vector))
+
+        if not pending:
+            return results
+
+        start = time.perf_counter()
+        # Same retrieval as answer_question, so batched and single answers share cache entries
+        if HYBRID_RETRIEVAL:
+            docs_per_query = self.knowledge_base.hybrid_search_batch(
+                [result["query"] for result, _ in pending], k=5,
+                query_vectors=[vector for _, vector in pending])
+        else:
+            docs_per_query = self.knowledge_base.search_batch([vector for _, vector in pending], k=5)
+        retrieval_time = (time.perf_counter() - start) / len(pending)
+
+        prompts = []
+        for (result, _), docs in zip(pending, docs_per_query):
+            prompt, result["context_tokens"] = self._build_prompt(result["query"], age, style, docs)
+            prompts.append(prompt)
+
+        for offset in range(0, len(pending), batch_size):
+            batch = pending[offset:offset + batch_size]
+            start = time.perf_counter()
+            inputs = self.tokenizer(prompts[offset:offset + batch_size], padding=True, truncation=True,
+                                    max_length=LLM_MAX_INPUT_TOKENS, return_tensors="pt")
+            with torch.no_grad():
+                outputs = self.model.generate(**inputs, **GENERATION_KWARGS)
+            answers = self.tokenizer.batch_decode(outputs, skip_special_tokens=True)
+            generation_time = (time.perf_counter() - start) / len(batch)
+
+            for (result, query_vector), answer in zip(batch, answers):
+                result["answer"] = answer.strip()
+                result["timings"].update({"retrieval_s": retrieval_time, "generation_s": generation_time})
+                self.answer_cache.store(query_vector, version, style_key, result["answer"], persist=False)
+
+        # One rewrite of the cache file per call rather than one per answered query
+        self.answer_cache.save()
+        return results
+
+    def _build_prompt(self, query, age, style, docs):
+        """
+        Fills the prompt template with as much deduplicated context as fits the model's input window.
+
+        Returns:
+            tuple: (prompt, context_tokens)
+        """
+        template = """
         You are a helpful AI assistant. 
         User Context: The user is {age} years old. {style}
         
@@ -91,6 +457,15 @@ class RAGEngine:
 
         Answer:
         """
-        response = self.llm.invoke(prompt)
-        
-        return response.strip()
+        fixed_tokens = len(self.tokenizer(template.format(age=age, style=style, context="", query=query)).input_ids)
+        context, context_tokens = pack_context(docs, self.tokenizer, max(0, LLM_MAX_INPUT_TOKENS - fixed_tokens))
+        return template.format(age=age, style=style, context=context, query=query), context_tokens
+
+    @staticmethod
+    def _style_for_age(age):
+        """Tune prompt style based on age. Returns (style_key, style_instruction)."""
+        if age < 12:
+            return "child", "Explain it simply like I am a 10-year-old child. Use easy words and short sentences."
+        elif age < 18:
+            return "teen", "Explain it clearly for a teenager. Be engaging but not too complex."
+        return "adult", "Explain it professionally and in detail for an adult."
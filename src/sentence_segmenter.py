@@ -0,0 +1,91 @@
+import re
+
+# Abbreviations whose trailing period does not end a sentence
+ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "etc", "e.g", "i.e", "ch", "vol"}
+# Abbreviations only when a number follows ("No. 5"); "No." on its own is a complete answer
+NUMBER_ABBREVIATIONS = {"no"}
+
+_BOUNDARY = re.compile(r'[.!?]+["\')\]]*\s+|\n+')
+# Where an over-long sentence may be broken: after a comma, semicolon or colon, or around a dash
+_CLAUSE = re.compile(r'[,;:]["\')\]]*\s+|\s+[-\u2013\u2014]+\s+')
+
+
+class SentenceSegmenter:
+    """
+    Incrementally splits streamed text into complete sentences.
+    A sentence is only emitted once the whitespace after its terminator has arrived,
+    so a period inside "3.14" or "e.g." mid-stream is never mistaken for a boundary.
+    """
+
+    def __init__(self, max_chars=None):
+        self.buffer = ""
+        self.max_chars = max_chars
+
+    def feed(self, text):
+        """Adds streamed text and returns the sentences it completed."""
+        self.buffer += text
+        sentences = []
+        start = 0
+        for match in _BOUNDARY.finditer(self.buffer):
+            candidate = self.buffer[start:match.end()].strip()
+            following = self.buffer[match.end():match.end() + 1]
+            if not candidate or self._ends_with_abbreviation(candidate, following):
+                continue
+            sentences.extend(self._split_long(candidate))
+            start = match.end()
+        self.buffer = self.buffer[start:]
+
+        # A run-on sentence is released clause by clause instead of waiting for its end
+        while self.max_chars and len(self.buffer) > self.max_chars:
+            cut = _clause_cut(self.buffer, self.max_chars)
+            piece = self.buffer[:cut].strip()
+            if piece:
+                sentences.append(piece)
+            self.buffer = self.buffer[cut:]
+        return sentences
+
+    def flush(self):
+        """Returns whatever text remains once the stream has ended."""
+        remainder = self.buffer.strip()
+        self.buffer = ""
+        return self._split_long(remainder) if remainder else []
+
+    def _split_long(self, sentence):
+        """Breaks a sentence longer than `max_chars` at clause, then word, boundaries."""
+        pieces = []
+        while self.max_chars and len(sentence) > self.max_chars:
+            cut = _clause_cut(sentence, self.max_chars)
+            pieces.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if sentence:
+            pieces.append(sentence)
+        return pieces
+
+    @staticmethod
+    def _ends_with_abbreviation(sentence, following=""):
+        """`following` is the character after the boundary whitespace ("" if it hasn't arrived yet)."""
+        last_word = sentence.rstrip(".!?\"')]").split()[-1:]
+        if not last_word or not sentence.rstrip().endswith("."):
+            return False
+        word = last_word[0].lower()
+        if word in NUMBER_ABBREVIATIONS:
+            # Undecided until the next character arrives; flush() still releases a final "No."
+            return following == "" or following.isdigit()
+        return word in ABBREVIATIONS
+
+
+def split_sentences(text, max_chars=None):
+    """Splits complete text into sentences, breaking any longer than `max_chars` at clauses."""
+    segmenter = SentenceSegmenter(max_chars)
+    return segmenter.feed(text) + segmenter.flush()
+
+
+def _clause_cut(text, max_chars):
+    """Index at which to cut `text` so the head fits in `max_chars`: last clause break, else last space."""
+    head = text[:max_chars + 1]
+    cut = 0
+    for match in _CLAUSE.finditer(head):
+        cut = match.end()
+    if cut == 0:
+        cut = head.rfind(" ") + 1
+    return cut if cut > 0 else max_chars
@@ -1,10 +1,10 @@
 import os
-import re
 import queue
 import threading
 import time
-from pydub import AudioSegment
-from src.tts_generator import generate_audio
+from src.tts_generator import iter_audio_segments
+
+PHRASE_MAX_CHARS = 60  # Short phrases keep the first lip-synced clip quick
 
 class StreamManager:
     def __init__(self, wav2lip_instance, output_dir="outputs"):
@@ -26,50 +26,25 @@ class StreamManager:
         thread.start()
 
     def _generation_worker(self, full_text, avatar_path):
-        # 1. Smart Splitting (Phrases)
-        # Split by punctuation but keep it
-        raw_phrases = re.split(r'([,.;?!])', full_text)
-        phrases = []
-        current = ""
-        
-        for part in raw_phrases:
-            current += part
-            # Chunk if punctuation or length > 60 chars
-            if re.match(r'[,.;?!]', part) or len(current) > 60:
-                if current.strip():
-                    phrases.append(current.strip())
-                current = ""
-        if current.strip():
-            phrases.append(current.strip())
+        # 1. Phrases are split at sentence/clause boundaries and synthesised ahead,
+        # so the next phrase's audio is ready while this one is lip-synced
+        phrase_audio = iter_audio_segments(full_text, max_chars=PHRASE_MAX_CHARS, as_clips=True)
             
         # 2. Loop
-        for i, phrase in enumerate(phrases):
+        for i, (phrase, clip) in enumerate(phrase_audio):
             if self.stop_event.is_set(): break
             
             # Paths
-            audio_path = os.path.join(self.output_dir, f"chunk_{i}.mp3")
             video_temp = os.path.join(self.output_dir, f"temp_{i}.mp4")
             
-            # Generate Audio
-            gen_audio = generate_audio(phrase)
-            if gen_audio:
-                if os.path.exists(audio_path): os.remove(audio_path)
-                os.rename(gen_audio, audio_path)
-                
-                # Duration
-                duration = 0
-                try:
-                    sound = AudioSegment.from_mp3(audio_path)
-                    duration = sound.duration_seconds
-                except: pass
-
-                # IN-MEMORY GENERATION (Fast!)
-                final_video = self.wav2lip.generate_video_file(avatar_path, audio_path, video_temp)
+            if clip:
+                # IN-MEMORY GENERATION (Fast!): decoded 16 kHz PCM goes straight to the renderer
+                final_video = self.wav2lip.generate_video_file(avatar_path, clip, video_temp)
                 
                 if final_video:
                     self.video_queue.put({
                         "video_path": final_video,
-                        "duration": duration,
+                        "duration": clip.duration,
                         "text": phrase
                     })
         
@@ -0,0 +1,103 @@
+import os
+import re
+import json
+import uuid
+import shutil
+import hashlib
+import logging
+import threading
+import unicodedata
+from src.config import TTS_CACHE_DIR, TTS_CACHE_MAX_BYTES
+from src.utils import touch, evict_lru
+
+logger = logging.getLogger("TTSCache")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text):
+    """Canonical form of text for cache lookups: NFC, collapsed whitespace, trimmed."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+class ClipCache:
+    """
+    Content-addressed store of synthesised clips keyed by normalised text, voice and format.
+    Clips are written atomically and evicted least recently used first above `max_bytes`,
+    so repeated phrases cost a file copy instead of a TTS round trip.
+    """
+
+    def __init__(self, cache_dir=TTS_CACHE_DIR, max_bytes=TTS_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key_for(self, text, voice, audio_format="mp3", backend="edge"):
+        payload = json.dumps({"text": normalize_text(text), "voice": voice, "format": audio_format,
+                              "backend": backend}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def fetch(self, key, output_file):
+        """Copies the cached clip for `key` to `output_file`. Returns False on a miss."""
+        path = self._clip_path(key)
+        try:
+            shutil.copyfile(path, output_file)
+        except FileNotFoundError:
+            self.misses += 1
+            return False
+        touch(path)
+        self.hits += 1
+        return True
+
+    def fetch_bytes(self, key):
+        """Returns the cached clip for `key` as bytes, or None on a miss."""
+        path = self._clip_path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        touch(path)
+        self.hits += 1
+        return data
+
+    def store(self, key, source_file):
+        """Copies a freshly synthesised clip into the cache, then evicts over the size budget."""
+        self._write(key, lambda tmp_path: shutil.copyfile(source_file, tmp_path))
+
+    def store_bytes(self, key, data):
+        """Stores an in-memory clip, then evicts over the size budget."""
+        def write(tmp_path):
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+        self._write(key, write)
+
+    def _write(self, key, write):
+        path = self._clip_path(key)
+        tmp_path = f"{path}.tmp-{uuid.uuid4().hex}"
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to cache clip {key[:12]}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        with self.lock:
+            self._evict()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_ratio": self.hits / lookups if lookups else 0.0}
+
+    def _clip_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.clip")
+
+    def _evict(self):
+        """Removes least recently used clips until the cache fits in `max_bytes`."""
+        clips = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir) if name.endswith(".clip")]
+        evict_lru(clips, self.max_bytes)
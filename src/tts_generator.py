@@ -1,75 +1,385 @@
 import asyncio
 import edge_tts
 import os
+import uuid
+import queue
+import threading
+import shutil
+import tempfile
+import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from tqdm import tqdm
-from src.config import VOICE_EN, VOICE_HI, TTS_CHUNK_SIZE, AUDIO_OUTPUT_FILENAME
+from src.config import (
+    VOICE_EN, VOICE_HI, TTS_CHUNK_SIZE, TTS_SEGMENT_CHARS, TTS_LOOKAHEAD, TTS_MAX_CONCURRENCY,
+    TTS_BACKEND, LOCAL_TTS_WORDS_PER_SECOND, TTS_SEGMENT_FILES_MAX_BYTES, OUTPUT_DIR,
+)
+from src.sentence_segmenter import SentenceSegmenter, split_sentences
+from src.tts_cache import ClipCache
+from src.audio_clip import AudioClip, LIPSYNC_SAMPLE_RATE
+from src.utils import evict_lru
 
-async def _generate_audio_chunk(text, voice, output_file):
-    """Generates a single audio chunk."""
+_clip_cache = None
+
+def get_clip_cache() -> ClipCache:
+    """Returns the process-wide TTS clip cache."""
+    global _clip_cache
+    if _clip_cache is None:
+        _clip_cache = ClipCache()
+    return _clip_cache
+
+async def _edge_tts_chunk(text, voice, output_file):
+    """Synthesises one chunk with the edge-tts service."""
     communicate = edge_tts.Communicate(text, voice)
     await communicate.save(output_file)
 
-async def _combine_audio_chunks(chunks, output_file):
-    """Combines multiple audio chunks into one file using FFMPEG."""
-    list_file = "chunks.txt"
+async def _local_tts_chunk(text, voice, output_file):
+    """Offline stand-in for the TTS service: silence as long as the text would take to speak."""
+    duration = max(0.5, len(text.split()) / LOCAL_TTS_WORDS_PER_SECOND)
+    process = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-y", "-f", "lavfi", "-i", "anullsrc=r=24000:cl=mono", "-t", f"{duration:.2f}",
+        "-c:a", "libmp3lame", "-q:a", "9", output_file, "-loglevel", "error",
+    )
+    if await process.wait() != 0:
+        raise RuntimeError(f"ffmpeg exited with code {process.returncode}")
+
+async def _edge_tts_bytes(text, voice):
+    """Synthesises one chunk with the edge-tts service, keeping the MP3 stream in memory."""
+    communicate = edge_tts.Communicate(text, voice)
+    data = bytearray()
+    async for message in communicate.stream():
+        if message["type"] == "audio":
+            data.extend(message["data"])
+    return bytes(data)
+
+# Async callables (text, voice, output_file) by name; tests can register their own
+TTS_BACKENDS = {
+    "edge": _edge_tts_chunk,
+    "local": _local_tts_chunk,
+}
+
+# Backends that can also return encoded audio without touching disk: (text, voice) -> bytes
+TTS_MEMORY_BACKENDS = {
+    "edge": _edge_tts_bytes,
+}
+
+async def _generate_audio_chunk(text, voice, output_file, backend=TTS_BACKEND):
+    """Generates a single audio chunk."""
+    await TTS_BACKENDS[backend](text, voice, output_file)
+
+async def _synthesise_chunks(chunks, voice, workspace, backend=TTS_BACKEND, max_concurrency=TTS_MAX_CONCURRENCY):
+    """Synthesises chunks concurrently, at most `max_concurrency` at a time, keeping their order."""
+    semaphore = asyncio.Semaphore(max_concurrency)
+    progress = tqdm(total=len(chunks), desc="TTS Progress")
+
+    async def synthesise(i, chunk):
+        chunk_file = os.path.join(workspace, f"chunk_{i}.mp3")
+        async with semaphore:
+            await _generate_audio_chunk(chunk, voice, chunk_file, backend)
+        progress.update(1)
+        return chunk_file
+
     try:
-        with open(list_file, "w") as f:
-            for chunk in chunks:
-                # Escape single quotes in filenames for ffmpeg
-                safe_chunk = chunk.replace("'", "'\\''")
-                f.write(f"file '{safe_chunk}'\n")
-                
-        # ffmpeg concat demuxer
-        command = f"ffmpeg -y -f concat -safe 0 -i {list_file} -c copy {output_file} -loglevel error"
-        os.system(command)
+        return await asyncio.gather(*(synthesise(i, chunk) for i, chunk in enumerate(chunks)))
     finally:
-        # Cleanup
-        if os.path.exists(list_file):
-            os.remove(list_file)
+        progress.close()
+
+def _combine_audio_chunks(chunks, output_file, workspace):
+    """Combines audio chunks into one file using FFMPEG; the list file stays in the workspace."""
+    if len(chunks) == 1:
+        shutil.move(chunks[0], output_file)
+        return
+
+    list_file = os.path.join(workspace, "chunks.txt")
+    with open(list_file, "w") as f:
         for chunk in chunks:
-            if os.path.exists(chunk):
-                os.remove(chunk)
+            # Escape single quotes in filenames for ffmpeg
+            safe_chunk = chunk.replace("'", "'\\''")
+            f.write(f"file '{safe_chunk}'\n")
+
+    # ffmpeg concat demuxer
+    subprocess.run(
+        ["ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", list_file, "-c", "copy", output_file, "-loglevel", "error"],
+        check=True,
+    )
 
-def generate_audio(text: str, lang: str = "en") -> str:
+def _chunk_text(text, max_chars=TTS_CHUNK_SIZE):
+    """Packs whole sentences into chunks of at most `max_chars`, so no word is cut in half."""
+    chunks, current = [], ""
+    for sentence in split_sentences(text, max_chars):
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        chunks.append(current)
+    return chunks
+
+def _unique_output_path(prefix="audio"):
+    return os.path.join(OUTPUT_DIR, f"{prefix}_{uuid.uuid4().hex}.mp3")
+
+def generate_audio(text: str, lang: str = "en", output_file: str = None, backend: str = TTS_BACKEND,
+                   use_cache: bool = True) -> str:
     """
     Generates audio from text using edge-tts.
-    Handles long text by chunking it into smaller pieces.
+    Long text is chunked at sentence boundaries and the chunks are synthesised concurrently in a private
+    temporary workspace, so concurrent calls never share intermediate files.
+    Text that was spoken before is copied from the clip cache instead of being synthesised again.
     
     Args:
         text (str): The text to convert to speech.
         lang (str): Language code ('en' or 'hi').
+        output_file (str, optional): Where to write the audio. Defaults to a unique file in OUTPUT_DIR.
+        backend (str): Name of the TTS backend in TTS_BACKENDS.
+        use_cache (bool): Look up and store the clip in the clip cache.
 
     Returns:
-        str: Path to the generated audio file.
+        str: Path to the generated audio file, or None on failure.
     """
     voice = VOICE_HI if lang == "hi" else VOICE_EN
-    output_file = AUDIO_OUTPUT_FILENAME
+    output_file = output_file or _unique_output_path()
 
-    # Split text into chunks to avoid timeouts
-    chunks = [text[i:i+TTS_CHUNK_SIZE] for i in range(0, len(text), TTS_CHUNK_SIZE)]
-    audio_chunks = []
-    
+    cache_key = None
+    if use_cache:
+        cache = get_clip_cache()
+        cache_key = cache.key_for(text, voice, "mp3", backend)
+        if cache.fetch(cache_key, output_file):
+            return output_file
+
+    # Split text into sentence-aligned chunks to avoid timeouts
+    chunks = _chunk_text(text)
+    if not chunks:
+        return None
+
+    workspace = tempfile.mkdtemp(prefix="tts_")
     try:
         print(f"Generating audio in {len(chunks)} chunks...")
-        for i, chunk in enumerate(tqdm(chunks, desc="TTS Progress")):
-            chunk_file = f"chunk_{i}.mp3"
-            asyncio.run(_generate_audio_chunk(chunk, voice, chunk_file))
-            audio_chunks.append(chunk_file)
-            
-        if len(audio_chunks) == 1:
-            if os.path.exists(output_file):
-                os.remove(output_file)
-            os.rename(audio_chunks[0], output_file)
-        else:
+        audio_chunks = asyncio.run(_synthesise_chunks(chunks, voice, workspace, backend))
+        if len(audio_chunks) > 1:
             print("Combining audio chunks...")
-            asyncio.run(_combine_audio_chunks(audio_chunks, output_file))
-            
+        _combine_audio_chunks(audio_chunks, output_file, workspace)
+        if cache_key:
+            get_clip_cache().store(cache_key, output_file)
         return output_file
 
     except Exception as e:
         print(f"Error generating TTS: {e}")
-        # Cleanup on failure
-        for chunk in audio_chunks:
-            if os.path.exists(chunk):
-                os.remove(chunk)
         return None
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+
+async def _synthesise_bytes(chunks, voice, backend=TTS_BACKEND, max_concurrency=TTS_MAX_CONCURRENCY):
+    """Synthesises chunks concurrently into one encoded byte string, in order."""
+    semaphore = asyncio.Semaphore(max_concurrency)
+    workspace = None if backend in TTS_MEMORY_BACKENDS else tempfile.mkdtemp(prefix="tts_")
+
+    async def synthesise(i, chunk):
+        async with semaphore:
+            if workspace is None:
+                return await TTS_MEMORY_BACKENDS[backend](chunk, voice)
+            chunk_file = os.path.join(workspace, f"chunk_{i}.mp3")
+            await _generate_audio_chunk(chunk, voice, chunk_file, backend)
+            with open(chunk_file, "rb") as f:
+                return f.read()
+
+    try:
+        # MP3 streams concatenate frame by frame, so the parts join without re-encoding
+        return b"".join(await asyncio.gather(*(synthesise(i, chunk) for i, chunk in enumerate(chunks))))
+    finally:
+        if workspace is not None:
+            shutil.rmtree(workspace, ignore_errors=True)
+
+def synthesise_clip(text: str, lang: str = "en", backend: str = TTS_BACKEND, use_cache: bool = True,
+                    sample_rate: int = LIPSYNC_SAMPLE_RATE) -> AudioClip:
+    """
+    Synthesises text straight to decoded PCM in memory, ready for the lip-sync renderer.
+    No file is written unless the clip is new to the clip cache.
+
+    Args:
+        text (str): The text to convert to speech.
+        lang (str): Language code ('en' or 'hi').
+        backend (str): Name of the TTS backend in TTS_BACKENDS.
+        use_cache (bool): Look up and store the encoded clip in the clip cache.
+        sample_rate (int): Sample rate of the decoded clip.
+
+    Returns:
+        AudioClip: Mono samples and their duration, or None on failure.
+    """
+    voice = VOICE_HI if lang == "hi" else VOICE_EN
+    chunks = _chunk_text(text)
+    if not chunks:
+        return None
+
+    try:
+        data = None
+        if use_cache:
+            cache_key = get_clip_cache().key_for(text, voice, "mp3", backend)
+            data = get_clip_cache().fetch_bytes(cache_key)
+        if data is None:
+            data = asyncio.run(_synthesise_bytes(chunks, voice, backend))
+            if use_cache:
+                get_clip_cache().store_bytes(cache_key, data)
+        return AudioClip.from_encoded(data, sample_rate)
+    except Exception as e:
+        print(f"Error generating TTS: {e}")
+        return None
+
+def generate_audio_from_paragraphs(paragraphs, lang: str = "en", output_file: str = None,
+                                   backend: str = TTS_BACKEND, max_concurrency: int = TTS_MAX_CONCURRENCY) -> str:
+    """
+    Generates audio for a stream of paragraphs, synthesising each ~TTS_CHUNK_SIZE group
+    as soon as it has arrived, so narration starts before the whole text is read.
+    Up to `max_concurrency` groups are synthesised at once, and at most twice that many
+    are held, so memory stays bounded however fast the text arrives.
+
+    Args:
+        paragraphs (iterable): Cleaned paragraphs, e.g. from `iter_paragraphs`.
+        lang (str): Language code ('en' or 'hi').
+        output_file (str, optional): Where to write the audio. Defaults to a unique file in OUTPUT_DIR.
+        backend (str): Name of the TTS backend in TTS_BACKENDS.
+        max_concurrency (int): Groups synthesised at the same time.
+
+    Returns:
+        str: Path to the generated audio file, or None if any group failed or there was no text.
+    """
+    output_file = output_file or _unique_output_path()
+    workspace = tempfile.mkdtemp(prefix="tts_")
+    segments, pending, group, group_len = [], deque(), [], 0
+
+    def collect():
+        # Groups finish in any order but are collected in reading order
+        segment_file = pending.popleft().result()
+        if segment_file is None:
+            raise RuntimeError(f"TTS failed for segment {len(segments)}")
+        segments.append(segment_file)
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        def submit():
+            segment_file = os.path.join(workspace, f"segment_{len(segments) + len(pending)}.mp3")
+            pending.append(pool.submit(generate_audio, "\n".join(group), lang, segment_file, backend))
+            while len(pending) >= 2 * max_concurrency:
+                collect()
+
+        try:
+            for paragraph in paragraphs:
+                group.append(paragraph)
+                group_len += len(paragraph) + 1
+                if group_len >= TTS_CHUNK_SIZE:
+                    submit()
+                    group, group_len = [], 0
+            if group:
+                submit()
+            while pending:
+                collect()
+            if not segments:
+                return None
+            if len(segments) > 1:
+                print(f"Combining {len(segments)} audio segments...")
+            _combine_audio_chunks(segments, output_file, workspace)
+            return output_file
+        except Exception as e:
+            # A narration with a missing part is worse than none
+            print(f"Error generating TTS: {e}")
+            for future in pending:
+                future.cancel()
+            return None
+        finally:
+            pool.shutdown(wait=True)
+            shutil.rmtree(workspace, ignore_errors=True)
+
+def iter_audio_segments(text, lang: str = "en", max_chars: int = TTS_SEGMENT_CHARS, lookahead: int = TTS_LOOKAHEAD,
+                        as_clips: bool = False, backend: str = TTS_BACKEND, use_cache: bool = True):
+    """
+    Splits text at sentence (then clause) boundaries and yields each segment's audio as soon
+    as it is ready, synthesising up to `lookahead` later segments in the background meanwhile.
+    The text is read on a producer thread, so a finished segment is never held back waiting
+    for the next one to close.
+
+    Args:
+        text (str or iterable): The full text, or successive pieces of it (e.g. LLM tokens).
+        lang (str): Language code ('en' or 'hi').
+        max_chars (int): Longest segment; longer sentences are broken at clauses.
+        lookahead (int): Segments synthesised ahead of the one being consumed.
+        as_clips (bool): Yield in-memory AudioClips instead of writing an audio file per segment.
+        backend (str): Name of the TTS backend in TTS_BACKENDS.
+        use_cache (bool): Look up and store each segment in the clip cache.
+
+    Yields:
+        tuple: (segment, audio) for each segment, in order, where audio is a file path
+            (or an AudioClip with `as_clips`). audio is None if TTS failed.
+    """
+    pieces = [text] if isinstance(text, str) else text
+    segmenter = SentenceSegmenter(max_chars)
+    lookahead = max(1, lookahead)
+
+    def segments():
+        for piece in pieces:
+            yield from segmenter.feed(piece)
+        yield from segmenter.flush()
+
+    def speak(segment):
+        if as_clips:
+            return segment, synthesise_clip(segment, lang, backend, use_cache)
+        audio_path = generate_audio(segment, lang, _unique_output_path("segment"), backend, use_cache)
+        _evict_segment_files()
+        return segment, audio_path
+
+    ready = queue.Queue()  # Futures in segment order, then None; an exception if reading the text failed
+    slots = threading.Semaphore(lookahead)
+    stopped = threading.Event()
+
+    def produce(pool):
+        try:
+            for segment in segments():
+                slots.acquire()
+                if stopped.is_set():
+                    return
+                ready.put(pool.submit(speak, segment))
+        except Exception as e:
+            ready.put(e)
+        finally:
+            ready.put(None)
+
+    with ThreadPoolExecutor(max_workers=lookahead) as pool:
+        # Daemon: a consumer that stops early must not wait for the text source to finish
+        threading.Thread(target=produce, args=(pool,), daemon=True).start()
+        try:
+            while True:
+                item = ready.get()
+                if item is None:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                slots.release()
+                yield item.result()
+        finally:
+            # The consumer stopped early: don't synthesise segments nobody will play
+            stopped.set()
+            slots.release()
+            while True:
+                try:
+                    item = ready.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not None and not isinstance(item, Exception):
+                    item.cancel()
+
+def _evict_segment_files():
+    """Keeps the per-sentence files in OUTPUT_DIR within TTS_SEGMENT_FILES_MAX_BYTES, oldest removed first."""
+    segments = [os.path.join(OUTPUT_DIR, name) for name in os.listdir(OUTPUT_DIR)
+                if name.startswith("segment_") and name.endswith(".mp3")]
+    evict_lru(segments, TTS_SEGMENT_FILES_MAX_BYTES)
+
+def iter_sentence_audio(text_stream, lang: str = "en"):
+    """
+    Synthesises streamed text one sentence at a time, as soon as each sentence closes.
+
+    Args:
+        text_stream (iterable): Successive pieces of text, e.g. tokens from the LLM.
+        lang (str): Language code ('en' or 'hi').
+
+    Yields:
+        tuple: (sentence, audio_path) for each sentence, in order. audio_path is None if TTS failed.
+    """
+    yield from iter_audio_segments(text_stream, lang)
@@ -1,5 +1,8 @@
-import logging
+import os
 import sys
+import shutil
+import hashlib
+import logging
 
 def setup_logger(name):
     logger = logging.getLogger(name)
@@ -11,3 +14,71 @@ def setup_logger(name):
     
     logger.addHandler(handler)
     return logger
+
+
+def file_sha256(path, block_size=1024 * 1024):
+    """Returns the hex SHA-256 digest of a file's contents, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def touch(path):
+    """Marks a cache entry as recently used for `evict_lru`. A vanished entry is ignored."""
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+
+
+def evict_lru(paths, max_bytes):
+    """
+    Removes the least recently used cache entries (files or directories, ordered by mtime)
+    until their total size fits in `max_bytes`. The newest entry is always kept, even if it
+    alone exceeds the budget. Entries renamed or removed concurrently are skipped.
+
+    Args:
+        paths (iterable): Cache entries to consider.
+        max_bytes (int): Size budget.
+
+    Returns:
+        list: The paths that were removed.
+    """
+    entries = []
+    for path in paths:
+        try:
+            entries.append((os.path.getmtime(path), _entry_size(path), path))
+        except OSError:
+            continue
+
+    total = sum(size for _, size, _ in entries)
+    evicted = []
+    for _, size, path in sorted(entries)[:-1]:
+        if total <= max_bytes:
+            break
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        evicted.append(path)
+        total -= size
+    return evicted
+
+
+def _entry_size(path):
+    if not os.path.isdir(path):
+        return os.path.getsize(path)
+    size = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                size += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                # Renamed or removed by a concurrent writer
+                pass
+    return size
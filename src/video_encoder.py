@@ -0,0 +1,155 @@
+import io
+import os
+import logging
+import tempfile
+import threading
+import subprocess
+from src.audio_clip import AudioClip
+from src.config import VIDEO_PRESET, VIDEO_CRF
+
+logger = logging.getLogger("VideoEncoder")
+
+
+class PipeVideoEncoder:
+    """
+    Streams raw BGR frames into a single ffmpeg process that encodes H.264 and muxes
+    the AAC audio track in the same pass, replacing an mp4v write followed by a remux.
+    With no output path the MP4 is fragmented to stdout and returned as bytes.
+
+    One process is started per phrase rather than per session: StreamManager hands each
+    phrase to the player as its own self-contained MP4, and phrase lengths are only known
+    once their audio is synthesised, so a long-lived process could not cut its output at
+    phrase boundaries. Process start-up is small next to a phrase's encode time
+    (`benchmark.py encode` reports it).
+    """
+
+    def __init__(self, width, height, fps, audio=None, output_path=None,
+                 preset=VIDEO_PRESET, crf=VIDEO_CRF):
+        """
+        Args:
+            width (int), height (int): Frame size.
+            fps (int): Frame rate.
+            audio (AudioClip or str, optional): In-memory clip (piped as raw PCM) or an audio file.
+            output_path (str, optional): Where to write the MP4. None keeps it in memory.
+            preset (str): x264 speed preset.
+            crf (int): x264 constant rate factor.
+        """
+        self.output_path = output_path
+        self.output = io.BytesIO()
+        self.stderr = bytearray()
+        self.broken = False
+        self.threads = []
+        self.temp_audio = None
+        pass_fds = ()
+        audio_fd = None
+
+        command = [
+            "ffmpeg", "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{width}x{height}", "-r", str(fps), "-i", "pipe:0",
+        ]
+        if isinstance(audio, AudioClip):
+            pcm = audio.to_pcm16()
+            if os.name == "posix":
+                # A second pipe carries the PCM, so no audio file is written
+                read_fd, audio_fd = os.pipe()
+                pass_fds = (read_fd,)
+                source = f"pipe:{read_fd}"
+            else:
+                self.temp_audio = tempfile.NamedTemporaryFile(suffix=".pcm", delete=False)
+                self.temp_audio.write(pcm)
+                self.temp_audio.close()
+                source = self.temp_audio.name
+            command += ["-f", "s16le", "-ar", str(audio.sample_rate), "-ac", "1", "-i", source]
+        elif audio:
+            command += ["-i", audio]
+
+        # yuv420p needs even dimensions; avatars can be any size (assets/custom_avatar.jpg is 600x613)
+        command += ["-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+                    "-c:v", "libx264", "-preset", preset, "-crf", str(crf), "-pix_fmt", "yuv420p"]
+        if audio is not None:
+            command += ["-c:a", "aac", "-shortest"]
+        if output_path:
+            command.append(output_path)
+        else:
+            command += ["-movflags", "frag_keyframe+empty_moov", "-f", "mp4", "pipe:1"]
+
+        try:
+            self.process = subprocess.Popen(
+                command, stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL if output_path else subprocess.PIPE,
+                stderr=subprocess.PIPE, pass_fds=pass_fds,
+            )
+        except Exception:
+            # Nothing will read the audio pipe or the temporary PCM file now
+            for fd in (*pass_fds, audio_fd):
+                if fd is not None:
+                    os.close(fd)
+            if self.temp_audio is not None:
+                os.remove(self.temp_audio.name)
+            raise
+        if pass_fds:
+            os.close(pass_fds[0])
+            self._spawn(self._write_audio, audio_fd, pcm)
+        if not output_path:
+            self._spawn(self._read_output)
+        self._spawn(self._read_stderr)
+
+    def write(self, frame):
+        """Sends one BGR frame (height, width, 3) uint8 to the encoder."""
+        if self.broken:
+            return
+        try:
+            self.process.stdin.write(frame.tobytes())
+        except BrokenPipeError:
+            # ffmpeg has exited; close() reports why
+            self.broken = True
+
+    def close(self):
+        """
+        Finishes encoding.
+
+        Returns:
+            str or bytes: The output path, or the MP4 bytes when encoding in memory. None on failure.
+        """
+        try:
+            self.process.stdin.close()
+        except BrokenPipeError:
+            pass
+        returncode = self.process.wait()
+        for thread in self.threads:
+            thread.join()
+        if self.temp_audio is not None:
+            os.remove(self.temp_audio.name)
+
+        if returncode != 0:
+            logger.error(f"ffmpeg exited with code {returncode}: {self.stderr.decode(errors='replace').strip()}")
+            return None
+        return self.output_path or self.output.getvalue()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self.process.poll() is None:
+            self.close()
+
+    def _spawn(self, target, *args):
+        thread = threading.Thread(target=target, args=args, daemon=True)
+        thread.start()
+        self.threads.append(thread)
+
+    @staticmethod
+    def _write_audio(fd, pcm):
+        try:
+            with os.fdopen(fd, "wb") as pipe:
+                pipe.write(pcm)
+        except BrokenPipeError:
+            pass
+
+    def _read_output(self):
+        for block in iter(lambda: self.process.stdout.read(1 << 16), b""):
+            self.output.write(block)
+
+    def _read_stderr(self):
+        for block in iter(lambda: self.process.stderr.read(1 << 12), b""):
+            self.stderr.extend(block)
@@ -0,0 +1,43 @@
+from src.chapter_index import ChapterIndex
+from src.pdf_extractor import _clean_text, _iter_clean_pages
+
+FILLER = "The verses go on at length\nabout duty and action\n" * 3
+
+
+def _build(pages):
+    return ChapterIndex.build(_iter_clean_pages(enumerate(pages)))
+
+
+def test_chapters_map_to_the_pages_their_headings_are_on():
+    # pdfplumber-style pages: single newlines only, headings mid-paragraph
+    pages = [
+        "Title page\nof the book",
+        FILLER + "Chapter 1 The Beginning\n" + FILLER,
+        FILLER,
+        FILLER + "Chapter 2 The Path\n" + FILLER,
+    ]
+    index = _build(pages)
+
+    assert index.table() == [(1, 1, 3), (2, 3, 3)]
+    assert index.chapter(2).startswith("Chapter 2 The Path")
+
+
+def test_text_matches_the_cleaned_book_and_hyphens_join_across_pages():
+    pages = ["Intro\n\nA hyphen-", "ated word on page two", "", "  \n", "Last page"]
+    index = _build(pages)
+
+    expected = "\n".join(p.strip() for p in _clean_text("\n".join(p for p in pages if p)).split("\n") if p.strip())
+    assert index.text == expected
+    assert index.page_of(index.text.index("hyphenated")) == 0
+    assert index.page_of(index.text.index("word")) == 1
+    assert index.page_of(index.text.index("Last")) == 4
+
+
+def test_save_and_load_round_trip(tmp_path):
+    index = _build(["Chapter 1\n" + FILLER, FILLER + "Chapter 2\n" + FILLER])
+    index.save("abc", cache_dir=str(tmp_path))
+
+    loaded = ChapterIndex.load("abc", cache_dir=str(tmp_path))
+    assert loaded.text == index.text
+    assert loaded.table() == index.table()
+    assert not [name for name in tmp_path.iterdir() if ".tmp" in name.name]
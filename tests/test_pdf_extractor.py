@@ -0,0 +1,37 @@
+from src.pdf_extractor import _clean_text, _iter_page_paragraphs
+
+
+def _pages(texts):
+    return list(enumerate(texts))
+
+
+def test_paragraphs_are_released_per_page_without_blank_lines():
+    # pdfplumber's extract_text() separates lines with single newlines only
+    pages = _pages([
+        "The first line of the book\nwraps onto a second line\nand ends the page",
+        "mid-sentence, carrying on\nthrough the second page with a hyphen-",
+        "ated word and a final line",
+    ])
+    released = []
+    consumed = []
+
+    def page_texts():
+        for page in pages:
+            consumed.append(page[0])
+            yield page
+
+    for page_index, paragraph in _iter_page_paragraphs(page_texts()):
+        released.append((len(consumed), page_index, paragraph))
+
+    # Text is handed out after each page is read, not only once the whole book is in
+    assert [pages_read for pages_read, _, _ in released] == [1, 2, 3]
+    full = _clean_text("\n".join(text for _, text in pages))
+    assert " ".join(paragraph for _, _, paragraph in released) == full
+    assert "hyphenated" in released[-1][2]
+
+
+def test_paragraph_breaks_and_page_starts_are_kept():
+    pages = _pages(["Intro line\n\nChapter 1 starts\nhere", "and goes on\n\nChapter 2"])
+    paragraphs = list(_iter_page_paragraphs(pages))
+    assert [text for _, text in paragraphs] == ["Intro line", "Chapter 1 starts", "here and goes on", "Chapter 2"]
+    assert [page for page, _ in paragraphs] == [0, 0, 0, 1]
@@ -0,0 +1,98 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
+import pytest
+import src.tts_generator as tts_generator
+from src.audio_clip import AudioClip
+from src.config import LOCAL_TTS_WORDS_PER_SECOND
+
+pytestmark = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="the local TTS backend needs ffmpeg")
+
+
+def _words(n):
+    return " ".join(["word"] * n) + "."
+
+
+def _seconds(words):
+    return max(0.5, words / LOCAL_TTS_WORDS_PER_SECOND)
+
+
+def _duration(path):
+    return AudioClip.from_file(path).duration
+
+
+@pytest.fixture
+def workspaces(monkeypatch):
+    """Records every temporary workspace generate_audio creates."""
+    created = []
+    mkdtemp = tempfile.mkdtemp
+
+    def recording_mkdtemp(*args, **kwargs):
+        path = mkdtemp(*args, **kwargs)
+        created.append(path)
+        return path
+
+    monkeypatch.setattr(tts_generator.tempfile, "mkdtemp", recording_mkdtemp)
+    return created
+
+
+def test_concurrent_calls_write_distinct_files(tmp_path, workspaces):
+    texts = [_words(n) for n in (2, 5, 8, 11)]
+    results = [None] * len(texts)
+
+    def speak(i):
+        results[i] = tts_generator.generate_audio(texts[i], backend="local", use_cache=False,
+                                                  output_file=str(tmp_path / f"call_{i}.mp3"))
+
+    threads = [threading.Thread(target=speak, args=(i,)) for i in range(len(texts))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(results)) == len(texts)
+    for words, path in zip((2, 5, 8, 11), results):
+        assert _duration(path) == pytest.approx(_seconds(words), abs=0.1)
+    assert workspaces and not any(os.path.exists(path) for path in workspaces)
+
+
+def test_chunks_keep_their_order_when_they_finish_out_of_order(tmp_path, monkeypatch):
+    word_counts = [3, 9, 1, 6]
+
+    async def reversed_local(text, voice, output_file):
+        # Earlier chunks finish last
+        await asyncio.sleep(0.1 * (len(word_counts) - texts.index(text)))
+        await tts_generator._local_tts_chunk(text, voice, output_file)
+
+    texts = [_words(n) for n in word_counts]
+    monkeypatch.setitem(tts_generator.TTS_BACKENDS, "local-reversed", reversed_local)
+
+    files = asyncio.run(tts_generator._synthesise_chunks(texts, "voice", str(tmp_path), backend="local-reversed"))
+
+    assert [_duration(path) for path in files] == pytest.approx([_seconds(n) for n in word_counts], abs=0.1)
+
+
+def test_long_text_is_chunked_and_combined(tmp_path, monkeypatch, workspaces):
+    chunk_text = tts_generator._chunk_text
+    monkeypatch.setattr(tts_generator, "_chunk_text", lambda text: chunk_text(text, max_chars=8))
+    text = " ".join(_words(1) for _ in range(4))
+
+    output = tts_generator.generate_audio(text, backend="local", use_cache=False, output_file=str(tmp_path / "long.mp3"))
+
+    # Four one-word chunks of 0.5 s each (plus MP3 frame padding), not one 1.6 s four-word clip
+    assert len(chunk_text(text, max_chars=8)) == 4
+    assert _duration(output) == pytest.approx(4 * _seconds(1), abs=0.3)
+    assert not any(os.path.exists(path) for path in workspaces)
+
+
+def test_workspace_is_removed_when_synthesis_fails(tmp_path, monkeypatch, workspaces):
+    async def failing(text, voice, output_file):
+        raise RuntimeError("service unavailable")
+
+    monkeypatch.setitem(tts_generator.TTS_BACKENDS, "failing", failing)
+
+    assert tts_generator.generate_audio(_words(3), backend="failing", use_cache=False,
+                                        output_file=str(tmp_path / "failed.mp3")) is None
+    assert workspaces and not any(os.path.exists(path) for path in workspaces)
@@ -0,0 +1,36 @@
+import os
+from src.utils import evict_lru, touch
+
+
+def _entry(path, size, mtime):
+    path.write_bytes(b"x" * size)
+    os.utime(path, (mtime, mtime))
+    return str(path)
+
+
+def test_evicts_least_recently_used_until_within_budget(tmp_path):
+    old = _entry(tmp_path / "old", 100, 1000)
+    used = _entry(tmp_path / "used", 100, 2000)
+    new = _entry(tmp_path / "new", 100, 3000)
+    touch(old)  # Now the most recently used
+
+    evicted = evict_lru([old, used, new], max_bytes=200)
+
+    assert evicted == [used]
+    assert os.path.exists(old) and os.path.exists(new)
+
+
+def test_newest_entry_is_kept_even_over_budget(tmp_path):
+    directory = tmp_path / "doc"
+    directory.mkdir()
+    _entry(directory / "page", 500, 2000)
+    os.utime(directory, (2000, 2000))
+    small = _entry(tmp_path / "small", 10, 1000)
+
+    assert evict_lru([small, str(directory)], max_bytes=100) == [small]
+    assert directory.exists()
+
+
+def test_vanished_entries_are_skipped(tmp_path):
+    kept = _entry(tmp_path / "kept", 10, 1000)
+    assert evict_lru([str(tmp_path / "gone"), kept], max_bytes=0) == []